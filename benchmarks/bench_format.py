@@ -0,0 +1,160 @@
+"""Benchmarks for `cjwmodule.arrow.format`.
+
+Arrays are deterministic: the same `n_rows` always produces the same values.
+"""
+import functools
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from cjwmodule.arrow.format import (
+    format_date_array,
+    format_number_array,
+    format_timestamp_array,
+    parse_number_format,
+    write_table_text,
+)
+
+NUMBER_TYPES = [
+    pa.int8(),
+    pa.int16(),
+    pa.int32(),
+    pa.int64(),
+    pa.uint8(),
+    pa.uint16(),
+    pa.uint32(),
+    pa.uint64(),
+    pa.float16(),
+    pa.float32(),
+    pa.float64(),
+    pa.decimal128(18, 2),
+]
+
+NUMBER_FORMATS = [
+    "{:,}",  # Workbench default
+    "{:,d}",
+    "${:,.2f}",
+    "{:.1%}",
+    "{:e}",  # no fast path: calls Python per value
+]
+
+DATE_UNITS = ["day", "week", "month", "quarter", "year"]
+
+
+@functools.lru_cache(maxsize=4)
+def make_number_array(
+    type: pa.DataType, n_rows: int, null_density: float, special_density: float
+) -> pa.Array:
+    """Build random numbers; NaN/inf (for floats) and nulls where requested."""
+    rng = np.random.default_rng(n_rows)
+    nulls = rng.random(n_rows) < null_density
+    if pa.types.is_decimal(type):
+        # Coefficients ("cents"), as 128-bit little-endian two's complement
+        cents = rng.integers(-(10 ** 12), 10 ** 12, n_rows)
+        words = np.stack([cents, cents >> 63], axis=1)
+        valid = pa.py_buffer(np.packbits(~nulls, bitorder="little"))
+        return pa.Array.from_buffers(
+            type, n_rows, [valid, pa.py_buffer(words)], null_count=int(nulls.sum())
+        )
+    if pa.types.is_floating(type):
+        dtype = type.to_pandas_dtype()
+        # Spread magnitudes, so each scale of number is represented
+        values = rng.normal(0, 1, n_rows) * 10.0 ** rng.integers(-3, 4, n_rows)
+        specials = rng.choice([np.nan, np.inf, -np.inf], n_rows)
+        values = np.where(rng.random(n_rows) < special_density, specials, values)
+        return pa.array(values.astype(dtype), mask=nulls)
+    info = np.iinfo(type.to_pandas_dtype())
+    values = rng.integers(
+        info.min, info.max, n_rows, dtype=type.to_pandas_dtype(), endpoint=True
+    )
+    return pa.array(values, mask=nulls)
+
+
+@functools.lru_cache(maxsize=2)
+def make_date_array(n_rows: int, unit: str) -> pa.Array:
+    """Build random dates from 1900 to 2100, truncated to `unit`."""
+    rng = np.random.default_rng(n_rows)
+    days = rng.integers(-25567, 47482, n_rows)  # 1900-01-01 to 2099-12-31
+    nulls = rng.random(n_rows) < 0.1
+    arr = pa.array(days.astype(np.int32), type=pa.date32(), mask=nulls)
+    if unit == "week":
+        arr = pa.array(
+            (days - (days + 3) % 7).astype(np.int32), pa.date32(), mask=nulls
+        )
+    return arr
+
+
+@functools.lru_cache(maxsize=2)
+def make_timestamp_array(n_rows: int, precision: str) -> pa.Array:
+    """Build random timestamps from 1900 to 2100, at whole `precision`."""
+    unit_ns = {"s": 1_000_000_000, "ms": 1_000_000, "ns": 1}[precision]
+    rng = np.random.default_rng(n_rows)
+    ns = rng.integers(-(2 ** 61), 2 ** 62, n_rows) // unit_ns * unit_ns
+    nulls = rng.random(n_rows) < 0.1
+    return pa.array(ns, type=pa.timestamp("ns"), mask=nulls)
+
+
+@pytest.mark.parametrize("format_s", NUMBER_FORMATS)
+@pytest.mark.parametrize("type", NUMBER_TYPES, ids=str)
+def bench_format_number_array(run_benchmark, n_rows, type, format_s):
+    arr = make_number_array(type, n_rows, 0.1, 0.0)
+    run_benchmark(format_number_array, arr, parse_number_format(format_s))
+
+
+@pytest.mark.parametrize("null_density", [0.0, 0.5, 0.99])
+@pytest.mark.parametrize("type", [pa.int64(), pa.float64()], ids=str)
+def bench_format_number_array_null_density(run_benchmark, n_rows, type, null_density):
+    arr = make_number_array(type, n_rows, null_density, 0.0)
+    run_benchmark(format_number_array, arr, parse_number_format("{:,}"))
+
+
+@pytest.mark.parametrize("format_s", ["{:,}", "${:,.2f}"])
+def bench_format_number_array_nan_inf(run_benchmark, n_rows, format_s):
+    arr = make_number_array(pa.float64(), n_rows, 0.1, 0.2)
+    run_benchmark(format_number_array, arr, parse_number_format(format_s))
+
+
+def bench_format_number_array_dictionary(run_benchmark, n_rows):
+    arr = pa.array(np.arange(n_rows) % 100 + 1900)  # "years": few distinct values
+    run_benchmark(
+        lambda arr: format_number_array(
+            arr, parse_number_format("{:d}"), dictionary=True
+        ),
+        arr,
+    )
+
+
+@pytest.mark.parametrize("unit", DATE_UNITS)
+def bench_format_date_array(run_benchmark, n_rows, unit):
+    run_benchmark(format_date_array, make_date_array(n_rows, unit), unit)
+
+
+@pytest.mark.parametrize("precision", ["s", "ms", "ns"])
+def bench_format_timestamp_array(run_benchmark, n_rows, precision):
+    run_benchmark(format_timestamp_array, make_timestamp_array(n_rows, precision))
+
+
+def bench_write_table_text(run_benchmark, n_rows):
+    table = pa.table(
+        {
+            "number": make_number_array(pa.float64(), n_rows, 0.1, 0.0),
+            "date": make_date_array(n_rows, "day"),
+            "timestamp": make_timestamp_array(n_rows, "s"),
+        }
+    )
+    schema = pa.schema(
+        [
+            table.schema.field("number").with_metadata({"format": "{:,.2f}"}),
+            table.schema.field("date").with_metadata({"unit": "day"}),
+            table.schema.field("timestamp"),
+        ]
+    )
+    table = table.cast(schema)
+
+    class NullWriter:
+        def write(self, b):
+            return len(b)
+
+    # run_benchmark() measures rows of its first argument, so pass a column
+    run_benchmark(lambda column: write_table_text(table, NullWriter()), table["number"])
@@ -0,0 +1,67 @@
+"""Fixtures for `cjwmodule` benchmarks.
+
+Every benchmark reports `rows`, `rows_per_second` (using the fastest round)
+and `peak_memory_bytes` in its `extra_info`, which `--benchmark-json` saves.
+"""
+import tracemalloc
+from typing import Any, Callable
+
+import pyarrow as pa
+import pytest
+
+DEFAULT_ROWS = "1000,1000000"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--rows",
+        default=DEFAULT_ROWS,
+        help="Comma-separated array lengths to benchmark (default %s)" % DEFAULT_ROWS,
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "n_rows" in metafunc.fixturenames:
+        rows = [int(s) for s in metafunc.config.getoption("rows").split(",")]
+        metafunc.parametrize("n_rows", rows, ids=lambda n: "%drows" % n)
+
+
+def _measure_peak_memory(fn: Callable[..., Any], *args) -> int:
+    """Estimate the most RAM `fn(*args)` uses at once, in bytes.
+
+    We add Python and NumPy's peak (traced by tracemalloc) to the bytes `fn`
+    leaves allocated in Arrow's memory pool (its output buffers). Arrow's
+    short-lived temporaries are not counted.
+    """
+    pool = pa.default_memory_pool()
+    arrow_before = pool.bytes_allocated()
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        _, python_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    arrow_output = pool.bytes_allocated() - arrow_before
+    del result
+    return python_peak + arrow_output
+
+
+@pytest.fixture
+def run_benchmark(benchmark):
+    """Benchmark `fn(arr, *args)` and record rows/s and peak memory."""
+
+    def run(fn: Callable[..., Any], arr: pa.Array, *args) -> Any:
+        n_rows = len(arr)
+        peak_memory_bytes = _measure_peak_memory(fn, arr, *args)
+        result = benchmark.pedantic(
+            fn,
+            args=(arr, *args),
+            rounds=3 if n_rows >= 1_000_000 else 50,
+            warmup_rounds=0 if n_rows >= 1_000_000 else 1,
+        )
+        benchmark.extra_info["rows"] = n_rows
+        benchmark.extra_info["rows_per_second"] = n_rows / benchmark.stats.stats.min
+        benchmark.extra_info["peak_memory_bytes"] = peak_memory_bytes
+        return result
+
+    return run
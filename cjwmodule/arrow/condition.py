@@ -1,14 +1,40 @@
+import functools
 import math
+import operator
 import re
 import warnings
-from typing import Any, Callable, Dict, List, Literal, Optional, Pattern, Tuple, Union
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pyarrow as pa
 import pyarrow.compute
+import pyarrow.ipc
 import re2
 
-__all__ = ["ConditionError", "condition_to_mask"]
+__all__ = [
+    "CompiledCondition",
+    "ConditionError",
+    "ConditionExpression",
+    "compile_condition",
+    "condition_to_expression",
+    "condition_to_mask",
+    "filter_batches",
+    "iter_condition_masks",
+]
 
 
 class ConditionError(Exception):
@@ -48,60 +74,322 @@ def _str_to_regex(s: str, case_sensitive: bool) -> Pattern:
         raise ConditionError([re.error(msg, pattern=s)]) from None
 
 
-def _and_or_condition_to_mask(
-    table, reducer, *, conditions: List[Dict[str, Any]]
+_MaskFunction = Callable[[pa.Table, Optional[Executor]], pa.ChunkedArray]
+"""Function that computes a table's mask, maybe using threads in an Executor."""
+
+# With an executor, we split columns into pieces of at most this many rows
+_PARALLEL_PIECE_LENGTH = 1 << 20
+
+
+def _map_column_pieces(
+    column: pa.ChunkedArray,
+    func: Callable[[pa.ChunkedArray], pa.ChunkedArray],
+    executor: Optional[Executor],
 ) -> pa.ChunkedArray:
+    """Compute the mask `func(column)`, in parallel if there is an `executor`.
+
+    With `executor`, we call `func` on zero-copy pieces of `column` in
+    threads. (pa.compute and re2 release the GIL.) Each piece is a
+    one-chunk ChunkedArray: pyarrow 4's `or_` over sliced Arrays can crash.
+    """
+    if executor is None:
+        return func(column)
+    pieces = [
+        pa.chunked_array([chunk.slice(start, _PARALLEL_PIECE_LENGTH)], column.type)
+        for chunk in column.chunks
+        for start in range(0, len(chunk), _PARALLEL_PIECE_LENGTH)
+    ]
+    if len(pieces) < 2:
+        return func(column)
+    return pa.chunked_array(
+        [chunk for mask in executor.map(func, pieces) for chunk in mask.chunks],
+        pa.bool_(),
+    )
+
+
+# AND/OR evaluate a later condition on just the undecided rows when at most
+# this fraction of rows are undecided. (Otherwise, gathering costs too much.)
+_SHORT_CIRCUIT_MAX_UNDECIDED_FRACTION = 0.25
+# AND/OR on tables this long measure their conditions' selectivity on a sample
+_SELECTIVITY_SAMPLE_MIN_ROWS = 65536
+_SELECTIVITY_SAMPLE_SIZE = 1024
+
+
+class _AndOrChild(NamedTuple):
+    """One compiled condition within an AND/OR."""
+
+    mask_table: _MaskFunction
+    columns: List[str]
+    cost: float
+
+
+def _condition_columns(condition: Dict[str, Any]) -> Set[str]:
+    """List the column names `condition` reads."""
+    if condition["operation"] in ("and", "or"):
+        return set().union(*(_condition_columns(c) for c in condition["conditions"]))
+    elif condition["operation"] == "not":
+        return _condition_columns(condition["condition"])
+    else:
+        return {condition["column"]}
+
+
+def _is_text_type(column_type: pa.DataType) -> bool:
+    return pa.types.is_unicode(column_type) or (
+        pa.types.is_dictionary(column_type)
+        and pa.types.is_unicode(column_type.value_type)
+    )
+
+
+def _estimate_condition_cost(schema: pa.Schema, condition: Dict[str, Any]) -> float:
+    """Guess how long `condition` takes per row, relative to a number comparison.
+
+    Dictionary-encoded text costs little: we test each distinct value once.
+    Regex and case-insensitive tests on plain text cost the most.
+    """
+    operation = condition["operation"]
+    if operation in ("and", "or"):
+        return sum(_estimate_condition_cost(schema, c) for c in condition["conditions"])
+    elif operation == "not":
+        return _estimate_condition_cost(schema, condition["condition"])
+
+    column_type = schema.field(condition["column"]).type
+    if not _is_text_type(column_type) or operation == "cell_is_null":
+        return 1.0
+    elif pa.types.is_dictionary(column_type):
+        return 3.0
+    elif operation.startswith("text_") and (
+        condition["isRegex"] or not condition["isCaseSensitive"]
+    ):
+        return 50.0
+    else:
+        return 5.0
+
+
+def _chunked_mask_to_numpy(mask: pa.ChunkedArray) -> np.ndarray:
+    return np.concatenate(
+        [np.zeros(0, dtype=bool)]
+        + [chunk.to_numpy(zero_copy_only=False) for chunk in mask.chunks]
+    )
+
+
+def _compile_and_or_condition(
+    schema: pa.Schema,
+    reducer,
+    decided_value: bool,
+    *,
+    conditions: List[Dict[str, Any]],
+) -> _MaskFunction:
+    """Build a function that reduces `conditions`' masks.
+
+    A row is decided once any condition gives it `decided_value` (False for
+    AND, True for OR). Each later condition runs on undecided rows only, if
+    there are few of them: we gather them into a smaller table and scatter
+    the results back.
+
+    The order of `conditions` doesn't change the result, so we pick the
+    order: cheapest first. On long tables, we evaluate each condition on a
+    sample first, and put conditions that decide more rows per cost first.
+    """
     errors = []
-    mask = None
+    children = []
     for condition in conditions:
         try:
-            new_mask = condition_to_mask(table, condition)
+            children.append(
+                _AndOrChild(
+                    _compile_condition(schema, condition),
+                    sorted(_condition_columns(condition)),
+                    _estimate_condition_cost(schema, condition),
+                )
+            )
         except ConditionError as err:
             errors.extend(err.errors)
-            new_mask = _all_false(table.columns[0])
-        if mask is None:
-            mask = new_mask
-        else:
-            mask = reducer(mask, new_mask)
     if errors:
         raise ConditionError(errors)
-    return mask
+    children.sort(key=lambda child: child.cost)
+
+    def order_by_sampled_selectivity(table: pa.Table) -> List[_AndOrChild]:
+        columns = sorted(set().union(*(child.columns for child in children)))
+        sample_indices = np.linspace(
+            0, table.num_rows - 1, _SELECTIVITY_SAMPLE_SIZE, dtype=np.int64
+        )
+        sample = pa.table({column: table[column] for column in columns}).take(
+            pa.array(sample_indices)
+        )
 
+        def rank(child: _AndOrChild) -> float:
+            values = _chunked_mask_to_numpy(child.mask_table(sample, None))
+            n_decided = np.count_nonzero(values == decided_value)
+            return child.cost * _SELECTIVITY_SAMPLE_SIZE / max(n_decided, 1)
 
-def _and_condition_to_mask(
-    table, *, conditions: List[Dict[str, Any]]
-) -> pa.ChunkedArray:
-    return _and_or_condition_to_mask(table, pa.compute.and_, conditions=conditions)
+        return sorted(children, key=rank)
 
+    def and_or_condition_to_mask(
+        table: pa.Table, executor: Optional[Executor]
+    ) -> pa.ChunkedArray:
+        if len(children) > 1 and table.num_rows >= _SELECTIVITY_SAMPLE_MIN_ROWS:
+            ordered_children = order_by_sampled_selectivity(table)
+        else:
+            ordered_children = children
+
+        mask = None
+        for i, child in enumerate(ordered_children):
+            if mask is None:
+                mask = child.mask_table(table, executor)
+                continue
+            values = _chunked_mask_to_numpy(mask)
+            undecided = np.flatnonzero(values != decided_value)
+            if len(undecided) == 0:
+                break  # later conditions can't change anything
+            elif len(undecided) > len(values) * _SHORT_CIRCUIT_MAX_UNDECIDED_FRACTION:
+                if executor is not None and table.num_rows <= _PARALLEL_PIECE_LENGTH:
+                    # Too short to split into pieces: run the remaining
+                    # conditions side by side instead. They mustn't use
+                    # `executor` themselves: a task that waits for tasks on
+                    # its own pool can deadlock.
+                    masks = executor.map(
+                        lambda sibling: sibling.mask_table(table, None),
+                        ordered_children[i:],
+                    )
+                    return functools.reduce(reducer, masks, mask)
+                mask = reducer(mask, child.mask_table(table, executor))
+            else:
+                subtable = pa.table({column: table[column] for column in child.columns})
+                submask = child.mask_table(subtable.take(pa.array(undecided)), executor)
+                values[undecided] = _chunked_mask_to_numpy(submask)
+                mask = pa.chunked_array([pa.array(values, pa.bool_())], pa.bool_())
+        return mask
+
+    return and_or_condition_to_mask
+
+
+def _compile_and_condition(
+    schema: pa.Schema, *, conditions: List[Dict[str, Any]]
+) -> _MaskFunction:
+    return _compile_and_or_condition(
+        schema, pa.compute.and_, False, conditions=conditions
+    )
 
-def _or_condition_to_mask(
-    table, *, conditions: List[Dict[str, Any]]
-) -> pa.ChunkedArray:
-    return _and_or_condition_to_mask(table, pa.compute.or_, conditions=conditions)
+
+def _compile_or_condition(
+    schema: pa.Schema, *, conditions: List[Dict[str, Any]]
+) -> _MaskFunction:
+    return _compile_and_or_condition(
+        schema, pa.compute.or_, True, conditions=conditions
+    )
 
 
-def _not_condition_to_mask(table, *, condition: Dict[str, Any]) -> pa.ChunkedArray:
-    return pa.compute.invert(
-        condition_to_mask(table, condition)
-    )  # raises ConditionError
+def _compile_not_condition(
+    schema: pa.Schema, *, condition: Dict[str, Any]
+) -> _MaskFunction:
+    func = _compile_condition(schema, condition)  # raises ConditionError
+    return lambda table, executor: pa.compute.invert(func(table, executor))
 
 
-def _array_map_to_bool(
-    array: pa.Array, func: Callable[[Optional[Any]], bool]
+def _array_regex_map_to_bool(
+    array: pa.StringArray, pattern_func: Callable[[memoryview], Any]
 ) -> pa.BooleanArray:
-    return pa.array((func(v) for v in array), type=pa.bool_(), size=len(array))
+    """Compute `pattern_func(v) is not None` on each valid value's UTF-8 bytes.
+
+    We slice Arrow's data buffer: no Python str per row. Null becomes False.
+    """
+    offset_dtype = np.int64 if pa.types.is_large_string(array.type) else np.int32
+    offsets = np.frombuffer(
+        array.buffers()[1],
+        dtype=offset_dtype,
+        count=len(array) + 1,
+        offset=array.offset * np.dtype(offset_dtype).itemsize,
+    ).tolist()
+    data_buf = array.buffers()[2]
+    data = memoryview(b"") if data_buf is None else memoryview(data_buf)
+    valid = pa.compute.is_valid(array).to_numpy(zero_copy_only=False)
+    result = np.zeros(len(array), dtype=bool)
+    for i in np.flatnonzero(valid).tolist():
+        result[i] = pattern_func(data[offsets[i] : offsets[i + 1]]) is not None
+    return pa.BooleanArray.from_buffers(
+        pa.bool_(),
+        len(array),
+        [None, pa.py_buffer(np.packbits(result, bitorder="little"))],
+    )
 
 
-def _compute_map_to_bool(
-    values: Union[pa.ChunkedArray, pa.Array], func: Callable[[Any], bool]
-) -> pa.ChunkedArray:
+def _array_regex_to_mask(
+    array: pa.StringArray,
+    arrow_pattern: str,
+    pattern_func: Callable[[memoryview], Any],
+) -> pa.BooleanArray:
+    try:
+        # Arrow's RE2, over the whole array
+        mask = pa.compute.match_substring_regex(array, pattern=arrow_pattern)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # An Arrow RE2 build that rejects the pattern
+        return _array_regex_map_to_bool(array, pattern_func)
+    return pa.compute.fill_null(mask, False)
+
+
+def _compute_regex_to_mask(
+    values: Union[pa.ChunkedArray, pa.Array],
+    arrow_pattern: str,
+    pattern_func: Callable[[memoryview], Any],
+) -> Union[pa.ChunkedArray, pa.BooleanArray]:
+    """Mask values that match a regex; null becomes False.
+
+    `arrow_pattern` is for Arrow's `match_substring_regex` kernel.
+    `pattern_func(utf8_bytes)` must give the same answer (None for no match),
+    for when the kernel rejects the pattern.
+    """
     if hasattr(values, "chunks"):
         return pa.chunked_array(
-            [_array_map_to_bool(chunk, func) for chunk in values.chunks],
+            [
+                _array_regex_to_mask(chunk, arrow_pattern, pattern_func)
+                for chunk in values.chunks
+            ],
             type=pa.bool_(),
         )
     else:
-        return _array_map_to_bool(values, func)
+        return _array_regex_to_mask(values, arrow_pattern, pattern_func)
+
+
+def _array_casefold_map_to_bool(
+    array: pa.StringArray,
+    ascii_func: Callable[[pa.StringArray], pa.BooleanArray],
+    str_func: Callable[[str], bool],
+) -> pa.BooleanArray:
+    # For ASCII text, str.casefold() is ASCII lowercase: use Arrow kernels.
+    # Other text (rare) needs Python's full case folding ("ß" => "ss").
+    mask = pa.compute.fill_null(ascii_func(pa.compute.ascii_lower(array)), False)
+    is_other = pa.compute.invert(pa.compute.string_is_ascii(array))
+    other_indices = np.flatnonzero(
+        pa.compute.fill_null(is_other, False).to_numpy(zero_copy_only=False)
+    )
+    if len(other_indices) == 0:
+        return mask
+    result = mask.to_numpy(zero_copy_only=False).copy()
+    result[other_indices] = [
+        str_func(v) for v in array.take(pa.array(other_indices)).to_pylist()
+    ]
+    return pa.array(result, type=pa.bool_())
+
+
+def _compute_casefold_map_to_bool(
+    values: Union[pa.ChunkedArray, pa.Array],
+    ascii_func: Callable[[pa.StringArray], pa.BooleanArray],
+    str_func: Callable[[str], bool],
+) -> Union[pa.ChunkedArray, pa.BooleanArray]:
+    """Compute `str_func(v)` on each non-null text `v`; null becomes False.
+
+    `ascii_func` must compute the same result (with nulls for nulls) for ASCII
+    text that was passed through `ascii_lower`.
+    """
+    if hasattr(values, "chunks"):
+        return pa.chunked_array(
+            [
+                _array_casefold_map_to_bool(chunk, ascii_func, str_func)
+                for chunk in values.chunks
+            ],
+            type=pa.bool_(),
+        )
+    else:
+        return _array_casefold_map_to_bool(values, ascii_func, str_func)
 
 
 def _build_text_array_masking_function(
@@ -132,8 +420,18 @@ def _build_text_array_masking_function(
         pattern_func = {"text_is": pattern.fullmatch, "text_contains": pattern.search}[
             operation
         ]
-        valuewise_func = lambda v: v.is_valid and pattern_func(v.as_py()) is not None
-        return lambda values: _compute_map_to_bool(values, valuewise_func)
+        # Same semantics, for Arrow's RE2 (which has no options argument)
+        arrow_pattern = {"text_is": "^(?:%s)$", "text_contains": "%s"}[operation] % (
+            value
+        )
+        if not case_sensitive:
+            arrow_pattern = "(?i)" + arrow_pattern
+        return lambda values: _compute_regex_to_mask(
+            values, arrow_pattern, pattern_func
+        )
+    elif operation == "text_contains" and value == "":
+        # pyarrow 4's match_substring finds no "" in "". Every text contains "".
+        return lambda values: pa.compute.is_valid(values)
     else:
         if case_sensitive:
             compute_func = {
@@ -145,15 +443,21 @@ def _build_text_array_masking_function(
             )
         else:
             casefolded_value = value.casefold()
-            valuewise_func = {
+            compute_func, str_func = {
                 "text_is": (
-                    lambda v: v.is_valid and v.as_py().casefold() == casefolded_value
+                    pa.compute.equal,
+                    lambda s: s.casefold() == casefolded_value,
                 ),
                 "text_contains": (
-                    lambda v: v.is_valid and casefolded_value in v.as_py().casefold()
+                    pa.compute.match_substring,
+                    lambda s: casefolded_value in s.casefold(),
                 ),
             }[operation]
-            return lambda values: _compute_map_to_bool(values, valuewise_func)
+            return lambda values: _compute_casefold_map_to_bool(
+                values,
+                lambda lowered: compute_func(lowered, casefolded_value),
+                str_func,
+            )
 
 
 def _dictionary_array_to_mask(
@@ -169,9 +473,10 @@ def _dictionary_array_to_mask(
     """
     index_mask = func(array.dictionary)  # index => [include?]
     index_set = pyarrow.array(
-        [i for i, v in enumerate(index_mask) if v.is_valid and v.as_py()],
+        np.flatnonzero(
+            pa.compute.fill_null(index_mask, False).to_numpy(zero_copy_only=False)
+        ),
         type=array.indices.type,
-        size=index_mask.true_count,
     )
     try:
         # pyarrow 3.x
@@ -182,32 +487,80 @@ def _dictionary_array_to_mask(
     return pa.compute.fill_null(mask, False)
 
 
+# Plain-text chunks at least this long may be dictionary-encoded first
+_LOW_CARDINALITY_MIN_LENGTH = 4096
+# How many rows we sample to guess a chunk's number of distinct values
+_LOW_CARDINALITY_SAMPLE_SIZE = 1024
+# Encode when the sample holds at most this many distinct values
+_LOW_CARDINALITY_MAX_SAMPLE_UNIQUE = 64
+
+
+def _is_low_cardinality(array: pa.StringArray) -> bool:
+    """Guess whether `array` repeats a few distinct values, by sampling.
+
+    A false guess costs speed, not correctness.
+    """
+    if len(array) < _LOW_CARDINALITY_MIN_LENGTH:
+        return False
+    sample_indices = np.linspace(
+        0, len(array) - 1, _LOW_CARDINALITY_SAMPLE_SIZE, dtype=np.int64
+    )
+    sample = array.take(pa.array(sample_indices))
+    return len(pa.compute.unique(sample)) <= _LOW_CARDINALITY_MAX_SAMPLE_UNIQUE
+
+
+def _text_chunk_to_mask(
+    chunk: pa.Array,
+    func: Callable[[pa.StringArray], pa.BooleanArray],
+    encode_low_cardinality: bool,
+) -> pa.BooleanArray:
+    if pa.types.is_dictionary(chunk.type):
+        return _dictionary_array_to_mask(chunk, func)
+    elif encode_low_cardinality and _is_low_cardinality(chunk):
+        # func() is costly per row: run it once per distinct value
+        return _dictionary_array_to_mask(chunk.dictionary_encode(), func)
+    else:
+        return func(chunk)
+
+
 def _text_column_to_mask(
-    column: pa.ChunkedArray, func: Callable[[pa.StringArray], pa.BooleanArray]
+    column: Union[pa.ChunkedArray, pa.Array],
+    func: Callable[[pa.StringArray], pa.BooleanArray],
+    *,
+    encode_low_cardinality: bool = False,
 ) -> pa.ChunkedArray:
     """Calls func(column) if column is StringArray; does dictionary magic otherwise.
 
+    If `encode_low_cardinality`, plain-text chunks that seem to hold few
+    distinct values get the dictionary magic, too. Use it when `func` costs
+    more than `dictionary_encode()`.
+
     Raise ConditionError with `errors=[re.error(...)]` on invalid regex.
     """
-    if pa.types.is_dictionary(column.type):
+    if not hasattr(column, "chunks"):
+        return _text_chunk_to_mask(column, func, encode_low_cardinality)
+    elif pa.types.is_dictionary(column.type) or encode_low_cardinality:
         return pa.chunked_array(
-            [_dictionary_array_to_mask(chunk, func) for chunk in column.chunks],
+            [
+                _text_chunk_to_mask(chunk, func, encode_low_cardinality)
+                for chunk in column.chunks
+            ],
             pa.bool_(),
         )
     else:
         return func(column)
 
 
-def _text_condition_to_mask(
-    table,
+def _compile_text_condition(
+    schema: pa.Schema,
     operation: str,
     *,
     column: str,
     value: str,
     isCaseSensitive: bool,
-    isRegex: bool
-) -> pa.ChunkedArray:
-    """Calculate a mask from `table` and arguments.
+    isRegex: bool,
+) -> _MaskFunction:
+    """Build a function that calculates a mask from a table.
 
     Raise ConditionError with `errors=[re.error(...)]` on invalid regex.
     """
@@ -215,7 +568,15 @@ def _text_condition_to_mask(
     func = _build_text_array_masking_function(
         operation, value, isCaseSensitive, isRegex
     )
-    return _text_column_to_mask(table[column], func)
+    # Regex and case folding cost more per row than hashing
+    encode_low_cardinality = isRegex or not isCaseSensitive
+    return lambda table, executor: _map_column_pieces(
+        table[column],
+        lambda values: _text_column_to_mask(
+            values, func, encode_low_cardinality=encode_low_cardinality
+        ),
+        executor,
+    )
 
 
 def _all_false(column: pa.ChunkedArray, value=None) -> pa.ChunkedArray:
@@ -321,11 +682,11 @@ def _prepare_for_number_column_operation(
     return operation, pa.scalar(value, column_type)
 
 
-def _number_condition_to_mask(
-    table, operation: str, *, column: str, value: Union[float, int]
-) -> pa.ChunkedArray:
+def _compile_number_condition(
+    schema: pa.Schema, operation: str, *, column: str, value: Union[float, int]
+) -> _MaskFunction:
     operation, value = _prepare_for_number_column_operation(
-        operation, value, table[column].type
+        operation, value, schema.field(column).type
     )
 
     func = {
@@ -338,8 +699,11 @@ def _number_condition_to_mask(
         "number_is_less_than_or_equals": pa.compute.less_equal,
     }[operation]
 
-    compared = func(table[column], value)
-    return pa.compute.fill_null(compared, False)
+    return lambda table, executor: _map_column_pieces(
+        table[column],
+        lambda values: pa.compute.fill_null(func(values, value), False),
+        executor,
+    )
 
 
 def _parse_date32(value: str) -> pa.scalar:
@@ -360,9 +724,9 @@ def _parse_timestamp(value: str) -> pa.scalar:
         return pa.scalar(np.datetime64(value, "ns"), pa.timestamp("ns"))
 
 
-def _timestamp_condition_to_mask(
-    table, operation: str, *, column: str, value: str
-) -> pa.ChunkedArray:
+def _compile_timestamp_condition(
+    schema: pa.Schema, operation: str, *, column: str, value: str
+) -> _MaskFunction:
     func = {
         "timestamp_is": pa.compute.equal,
         "timestamp_is_after": pa.compute.greater,
@@ -371,20 +735,22 @@ def _timestamp_condition_to_mask(
         "timestamp_is_before_or_equals": pa.compute.less_equal,
     }[operation]
 
-    field = table.schema.field(column)
+    field = schema.field(column)
     if pa.types.is_date32(field.type):
         compared_value = _parse_date32(value)
     else:
         compared_value = _parse_timestamp(value)
-    compared = func(table[column], compared_value)
-    return pa.compute.fill_null(compared, False)
+    return lambda table, executor: _map_column_pieces(
+        table[column],
+        lambda values: pa.compute.fill_null(func(values, compared_value), False),
+        executor,
+    )
 
 
-def _cell_is_empty(column: pa.ChunkedArray) -> pa.ChunkedArray:
-    if pa.types.is_unicode(column.type) or (
-        pa.types.is_dictionary(column.type)
-        and pa.types.is_unicode(column.type.value_type)
-    ):
+def _cell_is_empty(
+    column: Union[pa.ChunkedArray, pa.Array]
+) -> Union[pa.ChunkedArray, pa.BooleanArray]:
+    if _is_text_type(column.type):
         func = lambda values: pa.compute.fill_null(pa.compute.equal(values, ""), False)
         return pa.compute.or_(
             pa.compute.is_null(column), _text_column_to_mask(column, func)
@@ -393,40 +759,112 @@ def _cell_is_empty(column: pa.ChunkedArray) -> pa.ChunkedArray:
         return pa.compute.is_null(column)
 
 
-def _cell_condition_to_mask(table, operation: str, *, column: str) -> pa.ChunkedArray:
+def _compile_cell_condition(
+    schema: pa.Schema, operation: str, *, column: str
+) -> _MaskFunction:
     func = {"cell_is_null": pa.compute.is_null, "cell_is_empty": _cell_is_empty}[
         operation
     ]
-    return func(table[column])
+    return lambda table, executor: _map_column_pieces(table[column], func, executor)
 
 
-def _condition_to_mask_by_kwargs(
-    table: pa.Table, *, operation: str, **kwargs
-) -> pa.ChunkedArray:
+def _compile_condition_by_kwargs(
+    schema: pa.Schema, *, operation: str, **kwargs
+) -> _MaskFunction:
     # and/or/not: we don't pass an "operation" kwarg
     if operation == "and":
-        return _and_condition_to_mask(table, **kwargs)
+        return _compile_and_condition(schema, **kwargs)
     elif operation == "or":
-        return _or_condition_to_mask(table, **kwargs)
+        return _compile_or_condition(schema, **kwargs)
     elif operation == "not":
-        return _not_condition_to_mask(table, **kwargs)
+        return _compile_not_condition(schema, **kwargs)
     else:
         # Everything else: we do pass the "operation" kwarg
         if operation.startswith("text_"):
-            func = _text_condition_to_mask
+            func = _compile_text_condition
         elif operation.startswith("number_"):
-            func = _number_condition_to_mask
+            func = _compile_number_condition
         elif operation.startswith("timestamp_"):
-            func = _timestamp_condition_to_mask
+            func = _compile_timestamp_condition
         elif operation.startswith("cell_"):
-            func = _cell_condition_to_mask
+            func = _compile_cell_condition
         else:
             raise NotImplementedError("Unknown operation %r" % operation)
 
-    return func(table, operation, **kwargs)
+    return func(schema, operation, **kwargs)
+
+
+def _compile_condition(schema: pa.Schema, condition: Dict[str, Any]) -> _MaskFunction:
+    return _compile_condition_by_kwargs(schema, **condition)
+
+
+class CompiledCondition(NamedTuple):
+    """A condition, ready to mask any table or record batch with `schema`.
+
+    Build it with `compile_condition()`. Regexes are compiled and values are
+    parsed once, so calling `mask()` on many batches costs only the compute.
+    """
+
+    schema: pa.Schema
+    """Schema every `mask()` input must have."""
+
+    mask_table: _MaskFunction
+    """Function that computes the mask of a pa.Table with `schema`.
+
+    Call it as `mask_table(table, executor)`; `executor` may be None.
+    """
+
+    def mask(
+        self,
+        table_or_batch: Union[pa.Table, pa.RecordBatch],
+        *,
+        executor: Optional[Executor] = None,
+    ) -> Union[pa.ChunkedArray, pa.BooleanArray]:
+        """Build a Boolean array showing which rows match the condition.
+
+        Return a ChunkedArray for a pa.Table and a BooleanArray for a
+        pa.RecordBatch. The output has no nulls.
+
+        If `executor` is set (say, a `ThreadPoolExecutor`), evaluate pieces
+        of long columns and, on short tables, sibling conditions in its
+        threads. Don't call this from within one of `executor`'s own tasks.
+
+        Raise ValueError if `table_or_batch.schema` is not `self.schema`.
+        """
+        if not table_or_batch.schema.equals(self.schema):
+            raise ValueError("Input schema does not match the compiled schema")
+        if isinstance(table_or_batch, pa.RecordBatch):
+            table = pa.Table.from_batches([table_or_batch])
+            chunks = self.mask_table(table, executor).chunks
+            if len(chunks) == 1:
+                return chunks[0]
+            elif chunks:
+                return pa.concat_arrays(chunks)
+            else:
+                return pa.array([], pa.bool_())
+        else:
+            return self.mask_table(table_or_batch, executor)
+
+
+def compile_condition(
+    condition: Dict[str, Any], schema: pa.Schema
+) -> CompiledCondition:
+    """Prepare `condition` for masking many tables or batches with `schema`.
 
+    See `condition_to_mask()` for the format of `condition`.
 
-def condition_to_mask(table: pa.Table, condition: Dict[str, Any]) -> pa.ChunkedArray:
+    Raise ConditionError on invalid regex, listing every invalid regex in
+    `condition`.
+    """
+    return CompiledCondition(schema, _compile_condition(schema, condition))
+
+
+def condition_to_mask(
+    table: pa.Table,
+    condition: Dict[str, Any],
+    *,
+    executor: Optional[Executor] = None,
+) -> pa.ChunkedArray:
     """Build a Boolean ChunkedArray showing which rows of `table` match `condition`.
 
     condition must look like:
@@ -459,8 +897,216 @@ def condition_to_mask(table: pa.Table, condition: Dict[str, Any]) -> pa.ChunkedA
 
     The output has no nulls.
 
+    Pass `executor` (say, a `ThreadPoolExecutor`) to spread the work across
+    threads. See `CompiledCondition.mask()`.
+
     Raise ConditionError on invalid regex. `condition_errors.errors` is a
     list of `re.error` with valid `pattern` and `msg`. (The regex format is re2,
     but we wrap it in `re.error` for the `.pattern` that callers may want.)
     """
-    return _condition_to_mask_by_kwargs(table, **condition)
+    return compile_condition(condition, table.schema).mask(table, executor=executor)
+
+
+def _iter_record_batches(
+    reader: Union[pa.ipc.RecordBatchReader, pa.ipc.RecordBatchFileReader]
+) -> Iterator[pa.RecordBatch]:
+    if isinstance(reader, pa.ipc.RecordBatchFileReader):
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+    else:
+        yield from reader
+
+
+def _iter_batches_and_masks(
+    compiled: CompiledCondition,
+    reader: Union[pa.ipc.RecordBatchReader, pa.ipc.RecordBatchFileReader],
+    executor: Optional[Executor],
+) -> Iterator[Tuple[pa.RecordBatch, pa.BooleanArray]]:
+    for batch in _iter_record_batches(reader):
+        yield batch, compiled.mask(batch, executor=executor)
+
+
+def iter_condition_masks(
+    reader: Union[pa.ipc.RecordBatchReader, pa.ipc.RecordBatchFileReader],
+    condition: Dict[str, Any],
+    *,
+    executor: Optional[Executor] = None,
+) -> Iterator[pa.BooleanArray]:
+    """Yield a Boolean mask for each record batch `reader` reads.
+
+    `reader` may be a stream (say, `pa.ipc.open_stream(...)`) or a file. For
+    an Arrow IPC file on disk, `pa.ipc.open_file(pa.memory_map(path))` reads
+    batches without copying them, so memory stays bounded by one batch.
+
+    See `condition_to_mask()` for the format of `condition` and the meaning of
+    `executor`. Raise ConditionError on invalid regex before reading anything.
+    """
+    compiled = compile_condition(condition, reader.schema)  # raise ConditionError
+    return (mask for _, mask in _iter_batches_and_masks(compiled, reader, executor))
+
+
+def filter_batches(
+    reader: Union[pa.ipc.RecordBatchReader, pa.ipc.RecordBatchFileReader],
+    condition: Dict[str, Any],
+    *,
+    executor: Optional[Executor] = None,
+) -> Iterator[pa.RecordBatch]:
+    """Yield each record batch `reader` reads, without rows not matching `condition`.
+
+    Yield one batch per input batch, even when it has no rows left.
+
+    See `iter_condition_masks()`.
+    """
+    compiled = compile_condition(condition, reader.schema)  # raise ConditionError
+    return (
+        batch.filter(mask)
+        for batch, mask in _iter_batches_and_masks(compiled, reader, executor)
+    )
+
+
+class ConditionExpression(NamedTuple):
+    """A condition, split into a pyarrow.dataset filter and a leftover condition.
+
+    A row matches the original condition if and only if it matches
+    `expression` (None means, "every row") and `residual_condition` (None
+    means, "every row").
+    """
+
+    expression: Optional["pyarrow.dataset.Expression"]
+    """Filter for `pyarrow.dataset.Dataset.to_table(filter=...)`, or None."""
+
+    residual_condition: Optional[Dict[str, Any]]
+    """Condition for `condition_to_mask()` after the scan, or None."""
+
+
+_EXPRESSION_COMPARISONS = {
+    "number_is": operator.eq,
+    "number_is_greater_than": operator.gt,
+    "number_is_greater_than_or_equals": operator.ge,
+    "number_is_less_than": operator.lt,
+    "number_is_less_than_or_equals": operator.le,
+    "timestamp_is": operator.eq,
+    "timestamp_is_after": operator.gt,
+    "timestamp_is_after_or_equals": operator.ge,
+    "timestamp_is_before": operator.lt,
+    "timestamp_is_before_or_equals": operator.le,
+}
+
+
+def _leaf_condition_to_expression(
+    schema: pa.Schema, condition: Dict[str, Any]
+) -> Optional["pyarrow.dataset.Expression"]:
+    """Build an expression that is never null, or None if we can't.
+
+    condition_to_mask() treats null as False: `NOT (A > 1)` includes nulls. So
+    we guard comparisons with `is_valid()` to keep `~expression` correct.
+
+    We don't compare floating-point columns: Parquet statistics ignore NaN, so
+    readers would skip row groups whose NaN rows `NOT (A > 1)` should keep.
+    """
+    # Imported lazily: it's slow, and an optional part of pyarrow
+    import pyarrow.dataset as ds
+
+    operation = condition["operation"]
+    column_type = schema.field(condition["column"]).type
+    field = ds.field(condition["column"])
+
+    if operation.startswith("number_"):
+        operation, value = _prepare_for_number_column_operation(
+            operation, condition["value"], column_type
+        )
+        if operation == "all_true":
+            return field.is_valid()
+        elif operation == "all_false":
+            return ds.scalar(False)
+        elif pa.types.is_floating(column_type):
+            return None
+    elif operation.startswith("timestamp_"):
+        if pa.types.is_date32(column_type):
+            value = _parse_date32(condition["value"])
+        else:
+            value = _parse_timestamp(condition["value"])
+    elif operation == "cell_is_null":
+        return field.is_null()
+    elif operation == "cell_is_empty":
+        if _is_text_type(column_type):
+            return field.is_null() | (field == "")
+        else:
+            return field.is_null()
+    elif (
+        operation == "text_is"
+        and condition["isCaseSensitive"]
+        and not condition["isRegex"]
+    ):
+        value = condition["value"]
+        return field.is_valid() & (field == value)
+    else:
+        # Substring, regex and case-insensitive tests don't prune by
+        # statistics; and Arrow's lowercasing isn't str.casefold()
+        return None
+
+    return field.is_valid() & _EXPRESSION_COMPARISONS[operation](field, value)
+
+
+def _condition_to_expression(
+    schema: pa.Schema, condition: Dict[str, Any]
+) -> Tuple[Optional["pyarrow.dataset.Expression"], Optional[Dict[str, Any]]]:
+    operation = condition["operation"]
+    if operation == "and":
+        parts = [_condition_to_expression(schema, c) for c in condition["conditions"]]
+        expressions = [e for e, _ in parts if e is not None]
+        residuals = [r for _, r in parts if r is not None]
+        expression = (
+            functools.reduce(operator.and_, expressions) if expressions else None
+        )
+        if not residuals:
+            return expression, None
+        elif len(residuals) == 1:
+            return expression, residuals[0]
+        else:
+            return expression, {"operation": "and", "conditions": residuals}
+    elif operation == "or":
+        parts = [_condition_to_expression(schema, c) for c in condition["conditions"]]
+        if not parts or any(e is None for e, _ in parts):
+            return None, condition
+        expression = functools.reduce(operator.or_, (e for e, _ in parts))
+        if all(r is None for _, r in parts):
+            return expression, None
+        else:
+            # `expression` matches a superset of rows. Still, it can prune.
+            return expression, condition
+    elif operation == "not":
+        expression, residual = _condition_to_expression(schema, condition["condition"])
+        if residual is None:
+            return ~expression, None
+        else:
+            return None, condition
+    else:
+        expression = _leaf_condition_to_expression(schema, condition)
+        if expression is None:
+            return None, condition
+        else:
+            return expression, None
+
+
+def condition_to_expression(
+    condition: Dict[str, Any], schema: pa.Schema
+) -> ConditionExpression:
+    """Translate `condition` to a pyarrow.dataset filter, as far as possible.
+
+    Scans can push the filter into Parquet and IPC readers, which skip row
+    groups using min/max statistics. Whatever the filter can't express
+    (regex, case-insensitive or substring text tests) comes back as
+    `residual_condition`:
+
+        expression, residual = condition_to_expression(condition, dataset.schema)
+        table = dataset.to_table(filter=expression)
+        if residual is not None:
+            table = table.filter(condition_to_mask(table, residual))
+
+    See `condition_to_mask()` for the format of `condition`.
+
+    Raise ConditionError on invalid regex.
+    """
+    compile_condition(condition, schema)  # raise ConditionError
+    return ConditionExpression(*_condition_to_expression(schema, condition))
@@ -1,19 +1,48 @@
 import array
 import codecs
-import datetime
+import collections
+import functools
 import io
 import math
-import time
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from string import Formatter
-from typing import Callable, Iterator, Literal, NewType, Optional, Union
-
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    NewType,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute
 
 DateUnit = Literal["day", "week", "month", "quarter", "year"]
 
 __all__ = [
+    "ParseResult",
     "parse_number_format",
+    "parse_number_array",
+    "parse_timestamp_array",
+    "parse_date_array",
+    "FormattedColumnView",
+    "write_table_text",
     "format_number_array",
+    "format_number_column",
+    "format_date_array",
+    "format_date_column",
+    "format_timestamp_array",
+    "format_timestamp_column",
 ]
 
 _IntTypeSpecifiers = set("bcdoxXn")
@@ -32,6 +61,100 @@ can be stored exactly.)
 NumberFormatter = NewType("NumberFormatter", Callable[[Union[int, float]], str])
 
 
+_FAST_FORMAT_SPEC_PATTERN = re.compile(
+    r"\A(?P<grouping>,?)(?:\.(?P<precision>\d{1,2}))?(?P<type>[df%]?)\Z"
+)
+"""Format specs `format_number_array()` can format without calling Python.
+
+These are the formats Workbench users pick most: "{:,}", "{:d}", "{:,d}",
+"{:.2f}", "{:,.2f}", "{:.1%}" ... and any of those with a prefix or suffix.
+"""
+
+_FAST_MAX_PRECISION = 15
+"""Largest ".Nf" or ".N%" precision we format without calling Python.
+
+Beyond this, few float64 values can be scaled to an exact uint64.
+"""
+
+_FAST_BLOCK_SIZE = 1 << 16
+"""Number of rows to format at a time, to bound temporary-matrix RAM."""
+
+_FAST_MAX_FALLBACK_FRACTION = 0.75
+"""Share of rows beyond which formatting blocks costs more than it saves.
+
+Above it, the two block passes (plus splicing fallback rows) are slower
+than calling Python on every value.
+"""
+
+_MAX_UTF8_BYTES = (1 << 31) - 1
+"""Largest offset a `pa.utf8()` array can hold; bigger text is large_utf8."""
+
+_FORMATTER_CACHE_SIZE = 1024
+"""Number of distinct formats `parse_number_format()` remembers."""
+
+_POW10 = np.uint64(10) ** np.arange(20, dtype=np.uint64)
+_TWO_POW_52 = float(1 << 52)
+_TWO_POW_63 = float(1 << 63)
+
+
+class _FastNumberFormat(NamedTuple):
+    """A format `format_number_array()` can apply to entire blocks of numbers.
+
+    The output must be byte-for-byte what the per-value NumberFormatter would
+    produce. Values we cannot format exactly (for instance, float64 values that
+    are close to a rounding boundary) are formatted by the NumberFormatter.
+    """
+
+    prefix: bytes
+    """UTF-8-encoded text before the number."""
+
+    suffix: bytes
+    """UTF-8-encoded text after the number."""
+
+    grouping: bool
+    """True if we write "," every three integer digits."""
+
+    type: Literal["", "d", "f", "%"]
+    """Python format type: "" means general (but float-to-int, like "{:,}")."""
+
+    precision: int
+    """Number of decimals, for "f" and "%" types."""
+
+    explicit_precision: bool
+    """False if `precision` is Python's default, 6 ("{:f}").
+
+    `decimal.Decimal` has no default: "{:f}" keeps each value's own decimals.
+    """
+
+
+def _parse_fast_number_format(
+    prefix: str, format_spec: str, suffix: str
+) -> Optional[_FastNumberFormat]:
+    """Return a _FastNumberFormat, or None if `format_spec` is too exotic."""
+    match = _FAST_FORMAT_SPEC_PATTERN.match(format_spec)
+    if match is None:
+        return None
+    type = match.group("type")
+    precision = match.group("precision")
+    explicit_precision = precision is not None
+    if type == "" and explicit_precision:
+        return None  # "{:.3}" is like "g" -- too exotic
+    if precision is None:
+        precision = 6  # Python's default, for "f" and "%"
+    else:
+        precision = int(precision)
+    if precision > _FAST_MAX_PRECISION:
+        return None
+    return _FastNumberFormat(
+        prefix=prefix.encode("utf-8"),
+        suffix=suffix.encode("utf-8"),
+        grouping=match.group("grouping") == ",",
+        type=type,
+        precision=precision,
+        explicit_precision=explicit_precision,
+    )
+
+
 def parse_number_format(format_s: str) -> NumberFormatter:
     """
     Parse `format_s` to create a formatter function.
@@ -48,11 +171,19 @@ def parse_number_format(format_s: str) -> NumberFormatter:
     * It disallows variable name/numbers (e.g., `{1:d}`, `{value:d}`)
     * It raises ValueError on construction if format is imperfect
     * The function it returns will never raise an exception
+
+    Formatters are cached: calling `parse_number_format()` again with the
+    same `format_s` returns the same function, without re-parsing.
     """
 
     if not isinstance(format_s, str):
         raise TypeError("Format must be str")
 
+    return _compile_number_format(format_s)
+
+
+def _split_number_format(format_s: str) -> Tuple[str, str, str]:
+    """Return `(prefix, format_spec, suffix)`, or raise ValueError."""
     # parts: a list of (literal_text, field_name, format_spec, conversion)
     #
     # The "literal_text" always comes _before_ the field. So we end up
@@ -81,7 +212,6 @@ def parse_number_format(format_s: str) -> NumberFormatter:
         suffix = parts[1][0]
     else:
         suffix = ""
-    need_int = format_spec and format_spec[-1] in _IntTypeSpecifiers
 
     # Test it!
     #
@@ -97,10 +227,32 @@ def parse_number_format(format_s: str) -> NumberFormatter:
     # Therefore, if we can format an int, the format is valid.
     format(1, format_spec)  # raise ValueError on invalid format
 
-    def fn(value: Union[int, float]) -> str:
-        if need_int:
-            value = int(value)
-        else:
+    return prefix, format_spec, suffix
+
+
+@functools.lru_cache(maxsize=_FORMATTER_CACHE_SIZE)
+def _compile_number_format(format_s: str) -> NumberFormatter:
+    """Implement `parse_number_format()`, uncached.
+
+    lru_cache does not cache exceptions, so invalid formats are re-parsed (and
+    re-raise ValueError) each time.
+    """
+    prefix, format_spec, suffix = _split_number_format(format_s)
+    need_int = format_spec and format_spec[-1] in _IntTypeSpecifiers
+    fast_format = _parse_fast_number_format(prefix, format_spec, suffix)
+
+    # format_s.format(value) == prefix + format(value, format_spec) + suffix,
+    # in a single call.
+    format_value = format_s.format
+
+    if need_int:
+
+        def fn(value: Union[int, float]) -> str:
+            return format_value(int(value))
+
+    else:
+
+        def fn(value: Union[int, float]) -> str:
             # Format float64 _integers_ as int. For instance, '3.0' should be
             # formatted as though it were the int, '3'.
             #
@@ -111,13 +263,777 @@ def parse_number_format(format_s: str) -> NumberFormatter:
             int_value = int(value)
             if int_value == value:
                 value = int_value
+            return format_value(value)
 
-        return prefix + format(value, format_spec) + suffix
+    # format_number_array() reads this to skip calling fn() on each value
+    fn.fast_format = fast_format
+    # format_number_array(..., workers=N) sends this to worker processes
+    fn.format_s = format_s
 
     return fn
 
 
-def format_number_array(arr: pa.Array, fn: NumberFormatter) -> pa.Array:
+def _make_string_array(
+    *,
+    length: int,
+    value_offsets: pa.Buffer,
+    data: pa.Buffer,
+    null_bitmap: Optional[pa.Buffer],
+    null_count: int,
+    large: bool,
+) -> pa.Array:
+    """Build a utf8 array; or large_utf8 if `large` (meaning, 64-bit offsets)."""
+    array_class = pa.LargeStringArray if large else pa.StringArray
+    return array_class.from_buffers(
+        length=length,
+        value_offsets=value_offsets,
+        data=data,
+        null_bitmap=null_bitmap,
+        null_count=null_count,
+    )
+
+
+def _append_offset(out_offsets: array.array, offset: int) -> array.array:
+    """Append `offset` to uint32 `out_offsets`, widening to int64 on overflow.
+
+    Return `out_offsets`, or its int64 replacement. (We only copy offsets,
+    never the text they point to.)
+    """
+    try:
+        out_offsets.append(offset)
+    except OverflowError:
+        out_offsets = array.array("q", out_offsets)  # int64
+        out_offsets.append(offset)
+    return out_offsets
+
+
+def _offsets_buffer(out_offsets: array.array, offset: int) -> Tuple[pa.Buffer, bool]:
+    """Return `(value_offsets, large)` for `_make_string_array()`.
+
+    `out_offsets` is uint32 (or int64 after `_append_offset()` widened it);
+    `offset` is its final value. utf8 offsets are signed, so uint32 offsets
+    past 2GB must be widened to int64.
+    """
+    large = offset > _MAX_UTF8_BYTES
+    if large and out_offsets.typecode != "q":
+        out_offsets = array.array("q", out_offsets)  # int64
+    return pa.py_buffer(out_offsets), large  # zero-copy
+
+
+def _number_array_values(arr: pa.Array) -> np.ndarray:
+    """Return a zero-copy NumPy view of `arr`'s numbers (including nulls)."""
+    dtype = np.dtype(arr.type.to_pandas_dtype())
+    return np.frombuffer(
+        arr.buffers()[1],
+        dtype=dtype,
+        count=len(arr),
+        offset=arr.offset * dtype.itemsize,
+    )
+
+
+def _array_validity(arr: pa.Array) -> np.ndarray:
+    """Return a NumPy bool array: True where `arr` is not null."""
+    valid_buf = arr.buffers()[0]
+    if valid_buf is None or arr.null_count == 0:
+        return np.ones(len(arr), dtype=bool)
+    # Only unpack the bytes that hold this slice's bits
+    first_bit = arr.offset % 8
+    valid8s = np.frombuffer(
+        valid_buf,
+        dtype=np.uint8,
+        count=(first_bit + len(arr) + 7) // 8,
+        offset=arr.offset // 8,
+    )
+    bits = np.unpackbits(valid8s, bitorder="little")
+    return bits[first_bit : first_bit + len(arr)].view(bool)
+
+
+def _count_digits(magnitudes: np.ndarray) -> np.ndarray:
+    """Count decimal digits in each uint64 (at least 1)."""
+    n_digits = np.ones(len(magnitudes), dtype=np.int64)
+    for power in _POW10[1:]:
+        n_digits += magnitudes >= power
+    return n_digits
+
+
+def _magnitudes(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Split integers into `(is_negative, uint64 magnitudes)`."""
+    if values.dtype.kind == "u":
+        return np.zeros(len(values), dtype=bool), values.astype(np.uint64)
+    values = values.astype(np.int64)
+    negative = values < 0
+    # -(v + 1) cannot overflow, even for INT64_MIN
+    negated = (-(values + 1)).astype(np.uint64) + np.uint64(1)
+    return negative, np.where(negative, negated, values.astype(np.uint64))
+
+
+class _Segment(NamedTuple):
+    """Part of each row's text: for instance, the digits of a number.
+
+    Each row's text is right-aligned within `width` bytes.
+    """
+
+    width: int
+    """Maximum number of bytes on any row."""
+
+    lengths: np.ndarray
+    """Number of bytes on each row (or, if there is one value, on all rows)."""
+
+    render: Callable[[np.ndarray], None]
+    """Write text into a uint8 matrix with `width` columns and one row per row.
+
+    We call this lazily: `lengths` is enough to allocate output buffers.
+    """
+
+
+_ALWAYS = np.ones(1, dtype=bool)
+
+
+def _constant_segment(value: bytes, keep: np.ndarray = _ALWAYS) -> _Segment:
+    """Write `value` on every row where `keep` is True."""
+
+    def render(out: np.ndarray) -> None:
+        out[:] = np.frombuffer(value, dtype=np.uint8)
+
+    return _Segment(width=len(value), lengths=keep * len(value), render=render)
+
+
+def _fixed_segment(
+    magnitudes: np.ndarray, width: int, keep: np.ndarray = _ALWAYS
+) -> _Segment:
+    """Write zero-padded non-negative integers on every row where `keep` is True."""
+
+    def render(out: np.ndarray) -> None:
+        uint64s = magnitudes.astype(np.uint64)
+        for position in range(width):  # position 0 is the rightmost character
+            out[:, width - 1 - position] = uint64s // _POW10[position] % 10 + ord("0")
+
+    return _Segment(width=width, lengths=keep * width, render=render)
+
+
+def _digits_segment(
+    magnitudes: np.ndarray, n_digits: np.ndarray, grouping: bool
+) -> _Segment:
+    """Write uint64 `magnitudes` with `n_digits` digits (and maybe commas)."""
+    if grouping:
+        lengths = n_digits + (n_digits - 1) // 3
+    else:
+        lengths = n_digits
+    width = int(lengths.max(initial=1))
+
+    def render(out: np.ndarray) -> None:
+        for position in range(width):  # position 0 is the rightmost character
+            column = width - 1 - position
+            if grouping and position % 4 == 3:
+                out[:, column] = ord(",")
+            else:
+                digit_index = position - position // 4 if grouping else position
+                out[:, column] = magnitudes // _POW10[digit_index] % 10 + ord("0")
+
+    return _Segment(width=width, lengths=lengths, render=render)
+
+
+def _year_segments(years: np.ndarray, min_digits: int) -> List[_Segment]:
+    """Write years: "-" (if negative) and at least `min_digits` digits."""
+    negative, magnitudes = _magnitudes(years)
+    n_digits = np.maximum(_count_digits(magnitudes), min_digits)
+    return [
+        _constant_segment(b"-", negative),
+        _digits_segment(magnitudes, n_digits, False),
+    ]
+
+
+class _BlockLayout(NamedTuple):
+    """How to format a block of rows."""
+
+    segments: List[_Segment]
+    """Text to write on each row, left to right."""
+
+    emit: np.ndarray
+    """Bool array: False where rows must be empty (null or fallback)."""
+
+    fallback: Optional[np.ndarray] = None
+    """Indices of rows that `_format_blocks()` must format without `segments`."""
+
+
+def _segments_lengths(layout: _BlockLayout) -> np.ndarray:
+    """Count the bytes on each row of `layout` (ignoring fallback rows)."""
+    lengths = np.zeros(len(layout.emit), dtype=np.int64)
+    for segment in layout.segments:
+        lengths += segment.lengths
+    lengths[~layout.emit] = 0
+    return lengths
+
+
+def _render_segments(layout: _BlockLayout) -> np.ndarray:
+    """Concatenate `layout`'s segments into UTF-8 data (ignoring fallback rows)."""
+    n = len(layout.emit)
+    total_width = sum(segment.width for segment in layout.segments)
+    matrix = np.empty((n, total_width), dtype=np.uint8)
+    keep = np.empty((n, total_width), dtype=bool)
+    column = 0
+    for segment in layout.segments:
+        end = column + segment.width
+        segment.render(matrix[:, column:end])
+        np.greater_equal(
+            np.arange(segment.width),
+            (segment.width - segment.lengths)[:, None],
+            out=keep[:, column:end],
+        )
+        column = end
+    keep &= layout.emit[:, None]
+    return matrix[keep]
+
+
+def _splice_rows(
+    data: np.ndarray,
+    lengths: np.ndarray,
+    rows: np.ndarray,
+    value_data: bytes,
+    value_lengths: np.ndarray,
+) -> np.ndarray:
+    """Write values into the (empty) `rows` of `data`.
+
+    `lengths` describes `data`; `lengths[rows]` must be 0. `value_data` is
+    the values, concatenated; `value_lengths` describes it. Return new data.
+    """
+    new_lengths = lengths.copy()
+    new_lengths[rows] = value_lengths
+    new_starts = np.cumsum(new_lengths) - new_lengths
+    old_starts = np.cumsum(lengths) - lengths
+    value_starts = np.cumsum(value_lengths) - value_lengths
+    out = np.empty(int(new_lengths.sum()), dtype=np.uint8)
+    out[np.arange(len(data)) + np.repeat(new_starts - old_starts, lengths)] = data
+    out[
+        np.arange(int(value_lengths.sum()))
+        + np.repeat(new_starts[rows] - value_starts, value_lengths)
+    ] = np.frombuffer(value_data, dtype=np.uint8)
+    return out
+
+
+def _format_blocks(
+    valid: np.ndarray,
+    layout_block: Callable[[int, int], _BlockLayout],
+    format_fallback: Optional[Callable[[np.ndarray], List[bytes]]] = None,
+) -> pa.Array:
+    """Build a utf8 (or large_utf8) array, one block of rows at a time.
+
+    `layout_block(start, end)` describes rows `start:end`. Rows where `valid`
+    is False must not be emitted: they are null.
+
+    `format_fallback(rows)` returns UTF-8 text for the rows the layout can't
+    describe.
+
+    We make two passes. The first measures each row; then we allocate the
+    output offsets and data, through the Arrow memory pool, at their final
+    sizes. The second pass renders each block straight into the output data.
+    The only other copy of the text is one block's temporary output. (Layouts
+    are computed twice; that's cheaper than rendering.)
+    """
+    length = len(valid)
+    block_starts = range(0, length, _FAST_BLOCK_SIZE)
+
+    def block_end(start: int) -> int:
+        return min(start + _FAST_BLOCK_SIZE, length)
+
+    lengths = np.empty(length, dtype=np.int64)
+    # block start => (concatenated fallback values, their lengths). One bytes
+    # per block costs far less memory than one bytes per row.
+    fallback_values = {}
+    for start in block_starts:
+        layout = layout_block(start, block_end(start))
+        block_lengths = _segments_lengths(layout)
+        if layout.fallback is not None and len(layout.fallback):
+            values = format_fallback(start + layout.fallback)
+            value_lengths = np.array([len(value) for value in values], np.int32)
+            block_lengths[layout.fallback] = value_lengths
+            fallback_values[start] = (b"".join(values), value_lengths)
+            del values
+        lengths[start : block_end(start)] = block_lengths
+
+    n_bytes = int(lengths.sum())
+    large = n_bytes > _MAX_UTF8_BYTES
+    offset_dtype = np.dtype(np.int64 if large else np.int32)
+    offsets_buf = pa.allocate_buffer((length + 1) * offset_dtype.itemsize)
+    offsets = np.frombuffer(offsets_buf, dtype=offset_dtype)
+    offsets[0] = 0
+    np.cumsum(lengths, out=offsets[1:])
+    del lengths
+
+    data_buf = pa.allocate_buffer(n_bytes)
+    data = np.frombuffer(data_buf, dtype=np.uint8)
+    for start in block_starts:
+        end = block_end(start)
+        layout = layout_block(start, end)
+        block_data = _render_segments(layout)
+        if start in fallback_values:
+            block_data = _splice_rows(
+                block_data,
+                _segments_lengths(layout),
+                layout.fallback,
+                *fallback_values.pop(start),
+            )
+        data[offsets[start] : offsets[end]] = block_data
+
+    return _make_string_array(
+        length=length,
+        value_offsets=offsets_buf,
+        data=data_buf,
+        null_bitmap=pa.py_buffer(np.packbits(valid, bitorder="little")),
+        null_count=length - int(np.count_nonzero(valid)),
+        large=large,
+    )
+
+
+def _layout_number_block(
+    values: np.ndarray, valid: np.ndarray, fast: _FastNumberFormat
+) -> _BlockLayout:
+    """Describe how to format a block of `values`.
+
+    Invalid values produce 0-length output. Values we can't render exactly
+    with integer arithmetic are marked as fallback.
+    """
+    n = len(values)
+    is_float = values.dtype.kind == "f"
+    with np.errstate(invalid="ignore", over="ignore"):
+        if fast.type in ("f", "%"):
+            # Python converts int to float before formatting "f" or "%"
+            floats = values.astype(np.float64)
+            if fast.type == "%":
+                floats = floats * 100.0  # Python multiplies before rounding
+            negative = floats < 0  # -0.0 is formatted as int 0, so it is positive
+            scaled = np.abs(floats) * float(_POW10[fast.precision])
+            floor = np.floor(scaled)
+            # Beware values near a rounding boundary: `scaled` is inexact (up to
+            # half a ulp off). Python rounds the exact value; so must we.
+            fallback = valid & (
+                ~(scaled < _TWO_POW_52)
+                | (np.abs(scaled - floor - 0.5) <= np.spacing(scaled))
+            )
+            scaled[~valid | fallback] = 0.0
+            rounded = np.rint(scaled).astype(np.uint64)
+            pow10 = _POW10[fast.precision]
+            magnitudes = rounded // pow10
+            decimals = rounded % pow10
+        elif is_float:
+            truncated = np.trunc(values)
+            fallback = valid & ~(np.abs(truncated) < _TWO_POW_63)
+            if fast.type == "":
+                # "{:,}" formats integral floats as int; other floats are too
+                # exotic for us.
+                fallback |= valid & (truncated != values)
+            truncated[~valid | fallback] = 0.0
+            negative = truncated < 0
+            magnitudes = np.abs(truncated).astype(np.uint64)
+        else:
+            fallback = np.zeros(n, dtype=bool)
+            negative, magnitudes = _magnitudes(values)
+
+    segments = [
+        _constant_segment(fast.prefix),
+        _constant_segment(b"-", negative),
+        _digits_segment(magnitudes, _count_digits(magnitudes), fast.grouping),
+    ]
+    if fast.type in ("f", "%") and fast.precision > 0:
+        segments.append(_constant_segment(b"."))
+        segments.append(_fixed_segment(decimals, fast.precision))
+    if fast.type == "%":
+        segments.append(_constant_segment(b"%"))
+    segments.append(_constant_segment(fast.suffix))
+    return _BlockLayout(segments, valid & ~fallback, np.flatnonzero(fallback))
+
+
+def _fast_number_format_pays_off(arr: pa.Array, fast: _FastNumberFormat) -> bool:
+    """Return False if `fast` would leave most of `arr` to Python anyway.
+
+    "{:,}" formats integral floats in blocks, but not fractional ones.
+    """
+    if fast.type != "" or not pa.types.is_floating(arr.type):
+        return True
+    values = _number_array_values(arr)
+    valid = _array_validity(arr) & np.isfinite(values)
+    n_valid = np.count_nonzero(valid)
+    n_fractional = np.count_nonzero(valid & (np.trunc(values) != values))
+    return n_fractional <= _FAST_MAX_FALLBACK_FRACTION * n_valid
+
+
+def _format_number_array_fast(
+    arr: pa.Array, fn: NumberFormatter, fast: _FastNumberFormat
+) -> pa.Array:
+    values = _number_array_values(arr)
+    valid = _array_validity(arr)
+    if values.dtype.kind == "f":
+        # NaN, inf and -inf become null
+        valid = valid & np.isfinite(values)
+
+    return _format_blocks(
+        valid,
+        lambda start, end: _layout_number_block(
+            values[start:end], valid[start:end], fast
+        ),
+        lambda rows: [codecs.utf_8_encode(fn(v))[0] for v in values[rows].tolist()],
+    )
+
+
+def _decimal_unscaled_int64s(arr: pa.Array) -> Tuple[np.ndarray, np.ndarray]:
+    """Return `(unscaled, fits)` for a decimal128 or decimal256 array.
+
+    `unscaled` is the int64 coefficient of each value (value is
+    `unscaled * 10**-scale`), where `fits` is True. Elsewhere, the coefficient
+    needs more than 64 bits.
+    """
+    n_words = arr.type.bit_width // 64  # little-endian two's complement
+    words = np.frombuffer(
+        arr.buffers()[1],
+        dtype=np.int64,
+        count=len(arr) * n_words,
+        offset=arr.offset * n_words * 8,
+    ).reshape(len(arr), n_words)
+    unscaled = words[:, 0]
+    # The value fits in int64 if every high word merely extends the sign
+    fits = (words[:, 1:] == (unscaled >> 63)[:, None]).all(axis=1)
+    return unscaled, fits
+
+
+def _layout_decimal_block(
+    unscaled: np.ndarray,
+    valid: np.ndarray,
+    scale: int,
+    fast: Optional[_FastNumberFormat],
+) -> _BlockLayout:
+    """Describe how to format a block of decimal values.
+
+    `valid` must be False where `unscaled` doesn't hold the whole coefficient.
+    NumberFormatter semantics apply to `decimal.Decimal`: integral values
+    are formatted as int; others round half-even and keep their trailing
+    zeros ("{:,}" formats Decimal("1.50") as "1.50").
+    """
+    if fast is None or not 0 <= scale <= 18:
+        return _BlockLayout([], np.zeros(len(valid), dtype=bool), np.flatnonzero(valid))
+
+    negative, magnitudes = _magnitudes(np.where(valid, unscaled, 0))
+    pow10 = _POW10[scale]
+    integers = magnitudes // pow10
+    fractions = magnitudes % pow10
+    integral = fractions == 0
+    fallback = np.zeros(len(valid), dtype=bool)
+    segments = [_constant_segment(fast.prefix)]
+
+    if fast.type == "d":
+        # int(Decimal("-0.5")) is 0: no "-"
+        segments.append(_constant_segment(b"-", negative & (integers > 0)))
+        segments.append(
+            _digits_segment(integers, _count_digits(integers), fast.grouping)
+        )
+    elif fast.type == "":
+        # Decimal uses scientific notation when there are over 5 leading zeros
+        fallback = ~integral & (_count_digits(magnitudes) - scale <= -6)
+        segments.append(_constant_segment(b"-", negative))
+        segments.append(
+            _digits_segment(integers, _count_digits(integers), fast.grouping)
+        )
+        if scale > 0:
+            segments.append(_constant_segment(b".", ~integral))
+            segments.append(_fixed_segment(fractions, scale, ~integral))
+    else:
+        # Round to `precision` decimals (of the value, or of 100 * value).
+        # Integral values are formatted as int, which Python converts to float:
+        # we match it where the conversion is exact.
+        precision = fast.precision
+        if fast.type == "%":
+            scale -= 2
+            max_integral = np.uint64(1 << 46)  # so float(value) * 100 is exact
+        else:
+            max_integral = np.uint64(1 << 53)
+        shift = precision - scale
+        if shift >= 0:
+            # No rounding; but magnitudes * 10**shift must fit in uint64
+            factor = _POW10[shift]
+            fallback = magnitudes > np.uint64(0xFFFFFFFFFFFFFFFF) // factor
+            scaled = np.where(fallback, np.uint64(0), magnitudes) * factor
+        else:
+            # Round half to even
+            divisor = _POW10[-shift]
+            quotients = magnitudes // divisor
+            remainders = magnitudes % divisor
+            half = divisor // np.uint64(2)
+            round_up = (remainders > half) | (
+                (remainders == half) & (quotients % np.uint64(2) == 1)
+            )
+            scaled = quotients + round_up
+        fallback |= integral & (integers > max_integral)
+        if not fast.explicit_precision:
+            fallback |= ~integral
+        scaled[fallback] = 0
+        segments.append(_constant_segment(b"-", negative))
+        pow10 = _POW10[precision]
+        integer_digits = scaled // pow10
+        segments.append(
+            _digits_segment(
+                integer_digits, _count_digits(integer_digits), fast.grouping
+            )
+        )
+        if precision > 0:
+            segments.append(_constant_segment(b"."))
+            segments.append(_fixed_segment(scaled % pow10, precision))
+        if fast.type == "%":
+            segments.append(_constant_segment(b"%"))
+
+    segments.append(_constant_segment(fast.suffix))
+    fallback &= valid
+    return _BlockLayout(segments, valid & ~fallback, np.flatnonzero(fallback))
+
+
+def _format_decimal_array(arr: pa.Array, fn: NumberFormatter) -> pa.Array:
+    """Format a decimal128 or decimal256 array as `fn(decimal.Decimal)` would.
+
+    Values whose coefficient fits in int64 are formatted in blocks, if `fn`
+    has a fast format. Others are converted to `decimal.Decimal` and passed to
+    `fn`.
+    """
+    unscaled, fits = _decimal_unscaled_int64s(arr)
+    valid = _array_validity(arr)
+    fast = getattr(fn, "fast_format", None)
+
+    def layout_block(start: int, end: int) -> _BlockLayout:
+        layout = _layout_decimal_block(
+            unscaled[start:end],
+            valid[start:end] & fits[start:end],
+            arr.type.scale,
+            fast,
+        )
+        too_big = np.flatnonzero(valid[start:end] & ~fits[start:end])
+        if len(too_big):
+            layout = layout._replace(
+                fallback=np.union1d(layout.fallback, too_big).astype(np.int64)
+            )
+        return layout
+
+    def format_fallback(rows: np.ndarray) -> List[bytes]:
+        decimals = arr.take(pa.array(rows, pa.int64())).to_pylist()
+        return [codecs.utf_8_encode(fn(value))[0] for value in decimals]
+
+    return _format_blocks(valid, layout_block, format_fallback)
+
+
+def _format_distinct(
+    arr: pa.Array, format_array: Callable[[pa.Array], pa.Array], dictionary: bool
+) -> pa.Array:
+    """Call `format_array()` on each distinct value of `arr`; then map back.
+
+    If `dictionary` is True, return a `pa.DictionaryArray` with no unused or
+    duplicate values (as Workbench requires). Otherwise, return a utf8 array.
+    """
+    encoded = arr.dictionary_encode()  # nulls become null indices
+    # Distinct values may format to the same text (e.g., "{:d}" with 1.2 and
+    # 1.7), or to null (e.g., NaN).
+    formatted = format_array(encoded.dictionary)
+    if dictionary:
+        mapping = formatted.dictionary_encode()
+        return pa.DictionaryArray.from_arrays(
+            mapping.indices.take(encoded.indices), mapping.dictionary
+        )
+    else:
+        return formatted.take(encoded.indices)
+
+
+def _format_shared_number_range(
+    buf: memoryview,
+    type: pa.DataType,
+    length: int,
+    start: int,
+    stop: int,
+    format_s: str,
+) -> pa.StringArray:
+    """Format rows `start:stop` of `_format_number_range_in_worker()` input.
+
+    The result doesn't reference `buf`.
+    """
+    itemsize = np.dtype(type.to_pandas_dtype()).itemsize
+    n = stop - start
+    values_view = buf[start * itemsize : stop * itemsize]
+    valid8s_start = length * itemsize + start // 8  # start is a multiple of 8
+    valid8s_view = buf[valid8s_start : valid8s_start + (n + 7) // 8]
+    arr = pa.Array.from_buffers(
+        type, n, [pa.py_buffer(valid8s_view), pa.py_buffer(values_view)]
+    )
+    return format_number_array(arr, parse_number_format(format_s))
+
+
+def _format_number_range_in_worker(
+    input_name: str,
+    type: pa.DataType,
+    length: int,
+    start: int,
+    stop: int,
+    format_s: str,
+) -> Tuple[str, int, int]:
+    """Format rows `start:stop` of a shared-memory number array.
+
+    Run this in a worker process. The input shared memory holds `length`
+    values, followed by their validity bitmap (one bit per value).
+
+    Return `(output_name, null_count, n_data_bytes)`. The caller must unlink
+    the output shared memory, which holds the validity bitmap, then int64
+    offsets (`stop - start + 1` of them), then UTF-8 data.
+    """
+    n = stop - start
+    n_valid8s = (n + 7) // 8
+    input = shared_memory.SharedMemory(name=input_name)
+    try:
+        result = _format_shared_number_range(
+            input.buf, type, length, start, stop, format_s
+        )
+    except BaseException as err:
+        # The traceback's frames hold views of `input`: drop them to close it
+        raise err.with_traceback(None)
+    finally:
+        input.close()
+
+    offsets = np.frombuffer(
+        result.buffers()[1],
+        dtype=np.int64 if pa.types.is_large_string(result.type) else np.int32,
+        count=n + 1,
+    )
+    n_data_bytes = int(offsets[-1])
+    output = shared_memory.SharedMemory(
+        create=True, size=n_valid8s + (n + 1) * 8 + max(1, n_data_bytes)
+    )
+    try:
+        buf = np.ndarray(output.size, dtype=np.uint8, buffer=output.buf)
+        buf[:n_valid8s] = np.packbits(_array_validity(result), bitorder="little")
+        buf[n_valid8s : n_valid8s + (n + 1) * 8].view(np.int64)[:] = offsets
+        buf[n_valid8s + (n + 1) * 8 :][:n_data_bytes] = np.frombuffer(
+            result.buffers()[2], dtype=np.uint8, count=n_data_bytes
+        )
+        del buf
+        return output.name, result.null_count, n_data_bytes
+    except BaseException:
+        output.unlink()
+        raise
+    finally:
+        output.close()
+
+
+def _format_number_array_in_workers(
+    arr: pa.Array, format_s: str, workers: int
+) -> pa.StringArray:
+    """Format `arr` in `workers` processes; stitch their output together.
+
+    Values and output text travel through shared memory, not pickles. Each
+    worker formats a range of rows; ranges start at multiples of 8 rows, so
+    their validity bitmaps are byte-aligned.
+    """
+    length = len(arr)
+    values = _number_array_values(arr)
+    valid8s = np.packbits(_array_validity(arr), bitorder="little")
+    rows_per_worker = (length + workers - 1) // workers
+    rows_per_worker += -rows_per_worker % 8
+    ranges = [
+        (start, min(start + rows_per_worker, length))
+        for start in range(0, length, rows_per_worker)
+    ]
+
+    input = shared_memory.SharedMemory(
+        create=True, size=max(1, values.nbytes + len(valid8s))
+    )
+    try:
+        buf = np.ndarray(input.size, dtype=np.uint8, buffer=input.buf)
+        buf[: values.nbytes] = values.view(np.uint8)
+        buf[values.nbytes : values.nbytes + len(valid8s)] = valid8s
+        del buf
+        with ProcessPoolExecutor(
+            max_workers=len(ranges), mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _format_number_range_in_worker,
+                    input.name,
+                    arr.type,
+                    length,
+                    start,
+                    stop,
+                    format_s,
+                )
+                for start, stop in ranges
+            ]
+        # Leaving the `with` block waited for every future
+    finally:
+        input.close()
+        input.unlink()
+
+    # Unlink every output, even if another worker (or stitching) failed
+    output_names = [
+        future.result()[0]
+        for future in futures
+        if not future.cancelled() and future.exception() is None
+    ]
+    try:
+        parts = [future.result() for future in futures]  # raise worker error
+        return _stitch_worker_outputs(length, ranges, parts)
+    finally:
+        for name in output_names:
+            output = shared_memory.SharedMemory(name=name)
+            output.close()
+            output.unlink()
+
+
+def _stitch_worker_outputs(
+    length: int,
+    ranges: List[Tuple[int, int]],
+    parts: List[Tuple[str, int, int]],
+) -> pa.StringArray:
+    """Concatenate `_format_number_range_in_worker()` outputs.
+
+    The caller must unlink the outputs' shared memory.
+    """
+    n_data_bytes = sum(part[2] for part in parts)
+    large = n_data_bytes > _MAX_UTF8_BYTES
+    offset_dtype = np.dtype(np.int64 if large else np.int32)
+    offsets_buf = pa.allocate_buffer((length + 1) * offset_dtype.itemsize)
+    offsets = np.frombuffer(offsets_buf, dtype=offset_dtype)
+    offsets[0] = 0
+    data_buf = pa.allocate_buffer(n_data_bytes)
+    data = np.frombuffer(data_buf, dtype=np.uint8)
+    valid8s = np.empty((length + 7) // 8, dtype=np.uint8)
+    base = 0
+    null_count = 0
+    for (start, stop), (name, part_null_count, part_n_data_bytes) in zip(ranges, parts):
+        n = stop - start
+        n_valid8s = (n + 7) // 8
+        output = shared_memory.SharedMemory(name=name)
+        try:
+            buf = np.ndarray(output.size, dtype=np.uint8, buffer=output.buf)
+            valid8s[start // 8 : start // 8 + n_valid8s] = buf[:n_valid8s]
+            part_offsets = buf[n_valid8s : n_valid8s + (n + 1) * 8].view(np.int64)
+            offsets[start + 1 : stop + 1] = part_offsets[1:] + base
+            data[base : base + part_n_data_bytes] = buf[n_valid8s + (n + 1) * 8 :][
+                :part_n_data_bytes
+            ]
+            del buf, part_offsets
+        finally:
+            output.close()
+        base += part_n_data_bytes
+        null_count += part_null_count
+
+    return _make_string_array(
+        length=length,
+        value_offsets=offsets_buf,
+        data=data_buf,
+        null_bitmap=pa.py_buffer(valid8s),
+        null_count=null_count,
+        large=large,
+    )
+
+
+def format_number_array(
+    arr: pa.Array,
+    fn: NumberFormatter,
+    *,
+    deduplicate: bool = False,
+    dictionary: bool = False,
+    workers: Optional[int] = None,
+) -> pa.Array:
     """
     Build a PyArrow utf8 array from a number array.
 
@@ -125,9 +1041,52 @@ def format_number_array(arr: pa.Array, fn: NumberFormatter) -> pa.Array:
     NaT will become NULL outputs.
 
     The output Array will consume RAM using three new, contiguous buffers.
+
+    If `fn` came from `parse_number_format()` and its format is common (for
+    instance, "{:,}", "{:,d}", "${:,.2f}" or "{:.1%}"), whole blocks of numbers
+    are formatted at once. Otherwise, `fn` is called on each number.
+
+    If `deduplicate` is True, only distinct numbers are formatted. That is
+    faster when there are few distinct numbers (e.g., years or status codes).
+
+    If `dictionary` is True, deduplicate and return a `pa.DictionaryArray` that
+    Workbench will accept (no unused or duplicate values).
+
+    decimal128 and decimal256 arrays are formatted as though `fn` were called
+    with each `decimal.Decimal` value (without losing precision to float).
+
+    If `workers` is more than 1, split `arr` into ranges and format them in
+    that many processes, which share input and output through shared memory.
+    This is for huge arrays with exotic formats: starting processes (which
+    import pyarrow) takes about a second. `fn` must come from
+    `parse_number_format()`, because workers re-create it from its format
+    string.
     """
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be positive")
+
+    if deduplicate or dictionary:
+        return _format_distinct(
+            arr,
+            lambda values: format_number_array(values, fn, workers=workers),
+            dictionary,
+        )
+
+    if pa.types.is_decimal(arr.type):
+        return _format_decimal_array(arr, fn)
+
+    if workers is not None and workers > 1 and len(arr) > 0:
+        format_s = getattr(fn, "format_s", None)
+        if format_s is None:
+            raise ValueError("workers requires a fn from parse_number_format()")
+        return _format_number_array_in_workers(arr, format_s, workers)
+
+    fast = getattr(fn, "fast_format", None)
+    if fast is not None and _fast_number_format_pays_off(arr, fast):
+        return _format_number_array_fast(arr, fn, fast)
+
     # num_buf: byte-buffer holding numbers. num_buf[i*size:(i+1)*size] is the
-    # little-endian ith value in arr.
+    # little-endian (arr.offset+i)th value in arr.
     #
     # valid_buf: bitset of "valid" integers. valid_buf[(1 << i)] is 1 when
     # the ith entry in arr is set; it's 0 when the ith entry in arr is pa.NULL.
@@ -154,8 +1113,19 @@ def format_number_array(arr: pa.Array, fn: NumberFormatter) -> pa.Array:
         # HACK: give the same interface as PyArrow bitmap buffer.
         # Make validity bitmap all-ones.
         valid_buf = b"\xff" * ((len(arr) + 8) // 8)
+    elif arr.offset % 8 != 0:
+        # arr is a slice that starts mid-byte. Shift its bits so bit 0 is row 0.
+        valid_buf = np.packbits(_array_validity(arr), bitorder="little").tobytes()
+    else:
+        valid_buf = memoryview(valid_buf).cast("B")[arr.offset // 8 :]
 
-    nums = memoryview(num_buf).cast(struct_format)
+    if struct_format == "e":
+        # memoryview can't cast to float16. float32 holds every float16 exactly.
+        nums = memoryview(_number_array_values(arr).astype(np.float32))
+    else:
+        nums = memoryview(num_buf).cast(struct_format)[
+            arr.offset : arr.offset + len(arr)
+        ]
     num_iter = iter(nums)
     offset = 0
     n_extra_nulls = 0
@@ -166,7 +1136,7 @@ def format_number_array(arr: pa.Array, fn: NumberFormatter) -> pa.Array:
 
     # valid_buf is a bitset: 8 numbers per byte.
     # Iterate in groups of 8.
-    for in_valid8 in valid_buf:
+    for in_valid8 in valid_buf[: (len(arr) + 7) // 8]:
         out_valid8 = in_valid8
         try:
             for valid_i in range(8):
@@ -174,7 +1144,7 @@ def format_number_array(arr: pa.Array, fn: NumberFormatter) -> pa.Array:
                 is_valid = in_valid8 & valid_mask
                 num = next(num_iter)
                 # At each number, output the _start_ offset of that number
-                out_offsets.append(offset)
+                out_offsets = _append_offset(out_offsets, offset)
                 if is_valid:
                     if math.isfinite(num):
                         formatted, _ = codecs.utf_8_encode(fn(num))
@@ -194,126 +1164,181 @@ def format_number_array(arr: pa.Array, fn: NumberFormatter) -> pa.Array:
             pass
         out_valid8s.append(out_valid8)
 
-    out_offsets.append(offset)
+    out_offsets = _append_offset(out_offsets, offset)
+    value_offsets, large = _offsets_buffer(out_offsets, offset)
 
-    return pa.StringArray.from_buffers(
+    return _make_string_array(
         length=len(arr),
-        value_offsets=pa.py_buffer(out_offsets.tobytes()),
-        data=pa.py_buffer(bytes(out_utf8.getbuffer())),
-        null_bitmap=pa.py_buffer(out_valid8s.tobytes()),
+        value_offsets=value_offsets,
+        data=pa.py_buffer(out_utf8.getbuffer()),  # zero-copy
+        null_bitmap=pa.py_buffer(out_valid8s),
         null_count=arr.null_count + n_extra_nulls,
+        large=large,
     )
 
 
-_NS_PER_US = 1_000
-_NS_PER_MS = 1_000_000
-_NS_PER_SECOND = 1_000_000_000
-_NS_PER_MINUTE = _NS_PER_SECOND * 60
-_NS_PER_HOUR = _NS_PER_MINUTE * 60
-_NS_PER_DAY = _NS_PER_HOUR * 24
-_EPOCH_DATE_ORDINAL = datetime.date(1970, 1, 1).toordinal()
-
-
-def _ns_to_iso8601(ns: int) -> str:
-    # if ns < 0, days will be negative and ns will be positive (as we want)
-    days, ns = divmod(ns, _NS_PER_DAY)
-    days_str = datetime.date.fromordinal(days + _EPOCH_DATE_ORDINAL).isoformat()
-    if ns == 0:
-        return days_str
-    else:
-        hours, ns = divmod(ns, _NS_PER_HOUR)
-        minutes, ns = divmod(ns, _NS_PER_MINUTE)
-        parts = [days_str, "T", format(hours, "02d"), ":", format(minutes, "02d")]
-
-        if ns != 0:
-            seconds, ns = divmod(ns, _NS_PER_SECOND)
-            parts.append(":")
-            parts.append(format(seconds, "02d"))
-
-            if ns != 0:
-                ms, ns = divmod(ns, _NS_PER_MS)
-                parts.append(".")
-                parts.append(format(ms, "03d"))
+_UNITS_PER_SECOND = {"s": 1, "ms": 1_000, "us": 1_000_000, "ns": 1_000_000_000}
 
-                if ns != 0:
-                    us, ns = divmod(ns, _NS_PER_US)
-                    parts.append(format(us, "03d"))
 
-                    if ns != 0:
-                        parts.append(format(ns, "03d"))
+def _civil_from_days(days: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert days since 1970-01-01 to `(year, month, day)` int64 arrays.
 
-        parts.append("Z")
-        return "".join(parts)
+    The calendar is proleptic Gregorian, and years may be negative or past
+    9999. (Python `datetime.date` can't handle those years.)
 
+    This is Howard Hinnant's `civil_from_days()`, with NumPy integer math:
+    http://howardhinnant.github.io/date_algorithms.html#civil_from_days
+    """
+    days = days.astype(np.int64) + 719468  # days since 0000-03-01
+    era = days // 146097  # 400-year cycle; rounds down, even when negative
+    day_of_era = days - era * 146097  # [0, 146096]
+    year_of_era = (
+        day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096
+    ) // 365  # [0, 399]
+    day_of_year = day_of_era - (
+        365 * year_of_era + year_of_era // 4 - year_of_era // 100
+    )  # [0, 365], starting March 1
+    month_from_march = (5 * day_of_year + 2) // 153  # [0, 11]
+    day = day_of_year - (153 * month_from_march + 2) // 5 + 1  # [1, 31]
+    month = np.where(month_from_march < 10, month_from_march + 3, month_from_march - 9)
+    year = year_of_era + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def _days_from_civil(
+    year: np.ndarray, month: np.ndarray, day: np.ndarray
+) -> np.ndarray:
+    """Convert `(year, month, day)` int64 arrays to days since 1970-01-01.
+
+    This is the inverse of `_civil_from_days()`: Howard Hinnant's
+    `days_from_civil()`. It does not validate: "2021-02-31" is "2021-03-03".
+    http://howardhinnant.github.io/date_algorithms.html#days_from_civil
+    """
+    year = year - (month <= 2)  # years start March 1
+    era = year // 400  # rounds down, even when negative
+    year_of_era = year - era * 400  # [0, 399]
+    month_from_march = np.where(month > 2, month - 3, month + 9)  # [0, 11]
+    day_of_year = (153 * month_from_march + 2) // 5 + day - 1  # [0, 365]
+    day_of_era = (
+        year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    )  # [0, 146096]
+    return era * 146097 + day_of_era - 719468
+
+
+def _layout_timestamp_block(
+    values: np.ndarray, valid: np.ndarray, units_per_second: int
+) -> _BlockLayout:
+    """Describe how to format a block of timestamps.
+
+    The format is ISO8601, as precise as needed: "2022-08-01",
+    "2022-08-01T12:30Z", "2022-08-01T12:30:01Z", "2022-08-01T12:30:01.123Z",
+    "2022-08-01T12:30:01.123456Z", "2022-08-01T12:30:01.123456789Z".
+    """
+    units_per_minute = units_per_second * 60
+    units_per_hour = units_per_minute * 60
+    units_per_day = units_per_hour * 24
+
+    values = np.where(valid, values, 0)
+    days = values // units_per_day  # rounds down, even when negative
+    time_of_day = values - days * units_per_day
+    years, months, month_days = _civil_from_days(days)
+    nanoseconds = time_of_day % units_per_second * (1_000_000_000 // units_per_second)
+
+    # precision: 0=date, 1=minutes, 2=seconds, 3=ms, 4=us, 5=ns
+    precision = (
+        (time_of_day != 0).astype(np.int8)
+        + (time_of_day % units_per_minute != 0)
+        + (nanoseconds != 0)
+        + (nanoseconds % 1_000_000 != 0)
+        + (nanoseconds % 1_000 != 0)
+    )
 
-def _num_iter(
-    valid_buf: Optional[pa.Buffer], nums: memoryview
-) -> Iterator[Optional[Union[int, float]]]:
-    if valid_buf is None:
-        yield from nums
-    else:
-        num_iter = iter(nums)
-        # valid_buf is a bitset: 8 numbers per byte.
-        # Iterate in groups of 8.
-        try:
-            for in_valid8 in valid_buf:
-                for valid_i in range(8):
-                    valid_mask = 1 << valid_i
-                    is_valid = in_valid8 & valid_mask
-                    num = next(num_iter)  # raise StopIteration at end
-                    if is_valid:
-                        yield num
-                    else:
-                        yield None
-        except StopIteration:
-            pass  # we expect it
+    return _BlockLayout(
+        [
+            *_year_segments(years, 4),
+            _constant_segment(b"-"),
+            _fixed_segment(months, 2),
+            _constant_segment(b"-"),
+            _fixed_segment(month_days, 2),
+            _constant_segment(b"T", precision >= 1),
+            _fixed_segment(time_of_day // units_per_hour, 2, precision >= 1),
+            _constant_segment(b":", precision >= 1),
+            _fixed_segment(time_of_day // units_per_minute % 60, 2, precision >= 1),
+            _constant_segment(b":", precision >= 2),
+            _fixed_segment(time_of_day // units_per_second % 60, 2, precision >= 2),
+            _constant_segment(b".", precision >= 3),
+            _fixed_segment(nanoseconds // 1_000_000, 3, precision >= 3),
+            _fixed_segment(nanoseconds // 1_000 % 1_000, 3, precision >= 4),
+            _fixed_segment(nanoseconds % 1_000, 3, precision >= 5),
+            _constant_segment(b"Z", precision >= 1),
+        ],
+        valid,
+    )
 
 
-def format_timestamp_array(arr: pa.Array) -> pa.Array:
+def _layout_date_block(
+    values: np.ndarray, valid: np.ndarray, unit: DateUnit
+) -> _BlockLayout:
+    """Describe how to format a block of date32 values."""
+    years, months, month_days = _civil_from_days(np.where(valid, values, 0))
+    # Years are not zero-padded: year 5 is "5", not "0005"
+    segments = _year_segments(years, 1)
+    if unit == "quarter":
+        segments.append(_constant_segment(b" Q"))
+        segments.append(_fixed_segment((months + 2) // 3, 1))
+    elif unit != "year":
+        segments.append(_constant_segment(b"-"))
+        segments.append(_fixed_segment(months, 2))
+        if unit != "month":
+            segments.append(_constant_segment(b"-"))
+            segments.append(_fixed_segment(month_days, 2))
+    return _BlockLayout(segments, valid)
+
+
+def format_timestamp_array(
+    arr: pa.Array, *, deduplicate: bool = False, dictionary: bool = False
+) -> pa.Array:
     """Build a PyArrow utf8 array from a timestamp array.
 
     The output Array will have the same length as the input.
 
-    The output Array will consume RAM using two new, contiguous buffers.
-
-    The format will be ISO8601, as precise as needed.
-    """
-    valid_buf, num_buf = arr.buffers()
-    if arr.type.unit != "ns":
-        raise NotImplementedError("TODO handle non-ns")  # pragma: no cover
-
-    nums = memoryview(num_buf).cast("l")  # l = int64
-    num_iter = _num_iter(valid_buf, nums)
+    The output Array will consume RAM using three new, contiguous buffers.
 
-    offset = 0
-    out_offsets = array.array("I")  # uint32
-    out_utf8 = io.BytesIO()
+    The format will be ISO8601, as precise as needed. Any unit ("s", "ms",
+    "us", "ns") is allowed. Timestamps with a timezone are formatted in UTC
+    (with "Z" suffix), since that's how Arrow stores them.
 
-    for num in num_iter:
-        # At each number, output the _start_ offset of that number
-        out_offsets.append(offset)
-        if num is not None:
-            formatted, n = codecs.readbuffer_encode(_ns_to_iso8601(num))
-            out_utf8.write(formatted)
-            offset += n
+    `deduplicate` and `dictionary` behave as in `format_number_array()`.
+    """
+    if deduplicate or dictionary:
+        return _format_distinct(arr, format_timestamp_array, dictionary)
 
-    out_offsets.append(offset)
+    units_per_second = _UNITS_PER_SECOND[arr.type.unit]
+    values = np.frombuffer(
+        arr.buffers()[1], dtype=np.int64, count=len(arr), offset=arr.offset * 8
+    )
+    valid = _array_validity(arr)
 
-    return pa.StringArray.from_buffers(
-        length=len(arr),
-        value_offsets=pa.py_buffer(out_offsets.tobytes()),
-        data=pa.py_buffer(bytes(out_utf8.getbuffer())),
-        null_bitmap=valid_buf,
-        null_count=arr.null_count,
+    return _format_blocks(
+        valid,
+        lambda start, end: _layout_timestamp_block(
+            values[start:end], valid[start:end], units_per_second
+        ),
     )
 
 
-def format_date_array(arr: pa.Array, unit: DateUnit) -> pa.Array:
+def format_date_array(
+    arr: pa.Array,
+    unit: DateUnit,
+    *,
+    deduplicate: bool = False,
+    dictionary: bool = False,
+) -> pa.Array:
     """Build a PyArrow utf8 array from a date32 array.
 
     The output Array will have the same length as the input.
 
-    The output Array will consume RAM using two new, contiguous buffers.
+    The output Array will consume RAM using three new, contiguous buffers.
 
     Formats (for date "2022-08-01", a Monday):
 
@@ -323,61 +1348,765 @@ def format_date_array(arr: pa.Array, unit: DateUnit) -> pa.Array:
     * quarter: "2022 Q3"
     * year: "2022"
 
-    The format will be ISO8601, as precise as needed.
+    The format will be ISO8601, as precise as needed. Years are not
+    zero-padded, and they may be negative: date32 allows them.
+
+    `deduplicate` and `dictionary` behave as in `format_number_array()`.
     """
-    valid_buf, num_buf = arr.buffers()
-    nums = memoryview(num_buf).cast("i")  # i = int32
-    num_iter = _num_iter(valid_buf, nums)
+    if deduplicate or dictionary:
+        return _format_distinct(
+            arr, lambda values: format_date_array(values, unit), dictionary
+        )
 
-    offset = 0
-    out_offsets = array.array("I")  # uint32
-    out_utf8 = io.BytesIO()
+    values = np.frombuffer(
+        arr.buffers()[1], dtype=np.int32, count=len(arr), offset=arr.offset * 4
+    )
+    valid = _array_validity(arr)
+
+    return _format_blocks(
+        valid,
+        lambda start, end: _layout_date_block(
+            values[start:end], valid[start:end], unit
+        ),
+    )
 
-    # date32 allows negative years; Python `datetime.date` doesn't. Don't use
-    # datetime.date.
-    if unit == "year":
 
-        def _format(day: int) -> str:
-            return str(time.gmtime(86400 * day).tm_year)
+_DEFAULT_MAX_CHUNK_BYTES = 1 << 26  # 64MB
+"""Default `max_chunk_bytes` for `format_*_column()` functions."""
 
-    elif unit == "quarter":
 
-        def _format(day: int) -> str:
-            st = time.gmtime(86400 * day)
-            return str(st.tm_year) + " Q" + str((st.tm_mon + 2) // 3)
+def _string_array_nbytes_through(arr: pa.Array) -> np.ndarray:
+    """Return cumulative size of `arr`: `result[i]` is the size of `arr[:i]`.
+
+    We count the UTF-8 data and a 4-byte (utf8) offset for each row.
+    """
+    dtype = np.int64 if pa.types.is_large_string(arr.type) else np.int32
+    offsets = np.frombuffer(
+        arr.buffers()[1],
+        dtype=dtype,
+        count=len(arr) + 1,
+        offset=arr.offset * np.dtype(dtype).itemsize,
+    ).astype(np.int64)
+    return (offsets - offsets[0]) + 4 * np.arange(len(arr) + 1)
 
-    elif unit == "month":
 
-        def _format(day: int) -> str:
-            st = time.gmtime(86400 * day)
-            return str(st.tm_year) + "-" + str(st.tm_mon).zfill(2)
+def _as_utf8(arr: pa.Array) -> pa.StringArray:
+    """Return `arr` as utf8, sharing its UTF-8 data buffer.
 
+    `arr` is utf8 or large_utf8 with fewer than 2GB of text. We only rewrite
+    offsets (and, for large_utf8, the validity bitmap) -- not the text.
+    """
+    if not pa.types.is_large_string(arr.type):
+        return arr
+    offsets = np.frombuffer(
+        arr.buffers()[1], dtype=np.int64, count=len(arr) + 1, offset=arr.offset * 8
+    )
+    start = int(offsets[0])
+    if arr.null_count:
+        null_bitmap = pa.py_buffer(np.packbits(_array_validity(arr), bitorder="little"))
     else:
+        null_bitmap = None
+    return pa.StringArray.from_buffers(
+        length=len(arr),
+        value_offsets=pa.py_buffer((offsets - start).astype(np.int32)),
+        data=arr.buffers()[2].slice(start, int(offsets[-1]) - start),
+        null_bitmap=null_bitmap,
+        null_count=arr.null_count,
+    )
+
+
+def _split_string_array(
+    arr: pa.StringArray, max_chunk_bytes: int
+) -> Iterator[pa.StringArray]:
+    """Yield utf8 slices of `arr`, each at most `max_chunk_bytes` big.
 
-        def _format(day: int) -> str:
-            st = time.gmtime(86400 * day)
-            return (
-                str(st.tm_year)
-                + "-"
-                + str(st.tm_mon).zfill(2)
-                + "-"
-                + str(st.tm_mday).zfill(2)
+    A single value bigger than `max_chunk_bytes` gets a slice of its own.
+
+    Slices share `arr`'s text buffer, even if `arr` is large_utf8.
+    """
+    nbytes_through = _string_array_nbytes_through(arr)
+    start = 0
+    while start < len(arr):
+        end = (
+            np.searchsorted(
+                nbytes_through, nbytes_through[start] + max_chunk_bytes, side="right"
             )
+            - 1
+        )
+        end = max(int(end), start + 1)
+        yield _as_utf8(arr.slice(start, end - start))
+        start = end
+
+
+def _format_column(
+    column: pa.ChunkedArray,
+    format_array: Callable[[pa.Array], pa.Array],
+    max_chunk_bytes: int,
+) -> pa.ChunkedArray:
+    """Call `format_array()` on windows of `column`; return bounded chunks.
+
+    We format a few rows at a time, so the output of each `format_array()`
+    call is roughly `max_chunk_bytes` big. We guess how many rows that is by
+    measuring the previous window's output.
+    """
+    if max_chunk_bytes <= 0:
+        raise ValueError("max_chunk_bytes must be positive")
+    # Output chunks are utf8, so their offsets must fit in int32. (A window of
+    # input may format to large_utf8; we split it into utf8 chunks.)
+    max_chunk_bytes = min(max_chunk_bytes, _MAX_UTF8_BYTES)
+
+    chunks = []
+    n_rows = max(1, max_chunk_bytes // 16)  # first guess: 12-byte values
+    for chunk in column.chunks:
+        start = 0
+        while start < len(chunk):
+            window = chunk.slice(start, n_rows)  # zero-copy
+            formatted = format_array(window)
+            chunks.extend(_split_string_array(formatted, max_chunk_bytes))
+            start += len(window)
+            nbytes = int(_string_array_nbytes_through(formatted)[-1])
+            n_rows = max(1, len(window) * max_chunk_bytes // max(1, nbytes))
+    return pa.chunked_array(chunks, pa.utf8())
+
+
+def format_number_column(
+    column: pa.ChunkedArray,
+    fn: NumberFormatter,
+    *,
+    max_chunk_bytes: int = _DEFAULT_MAX_CHUNK_BYTES,
+) -> pa.ChunkedArray:
+    """Build a PyArrow utf8 ChunkedArray from a number ChunkedArray.
+
+    This is like `format_number_array()` on each chunk; but output chunks'
+    sizes (UTF-8 data plus offsets) stay under `max_chunk_bytes`, even when
+    input chunks are huge. Each output chunk is formatted separately, so peak
+    RAM is proportional to `max_chunk_bytes`, not to the size of the column.
+    """
+    return _format_column(
+        column, lambda values: format_number_array(values, fn), max_chunk_bytes
+    )
 
-    for num in num_iter:
-        # At each number, output the _start_ offset of that number
-        out_offsets.append(offset)
-        if num is not None:
-            formatted, n = codecs.readbuffer_encode(_format(num))
-            out_utf8.write(formatted)
-            offset += n
 
-    out_offsets.append(offset)
+def format_timestamp_column(
+    column: pa.ChunkedArray, *, max_chunk_bytes: int = _DEFAULT_MAX_CHUNK_BYTES
+) -> pa.ChunkedArray:
+    """Build a PyArrow utf8 ChunkedArray from a timestamp ChunkedArray.
 
-    return pa.StringArray.from_buffers(
-        length=len(arr),
-        value_offsets=pa.py_buffer(out_offsets.tobytes()),
-        data=pa.py_buffer(bytes(out_utf8.getbuffer())),
-        null_bitmap=valid_buf,
-        null_count=arr.null_count,
+    Output chunks obey `max_chunk_bytes`, as in `format_number_column()`.
+    """
+    return _format_column(column, format_timestamp_array, max_chunk_bytes)
+
+
+def format_date_column(
+    column: pa.ChunkedArray,
+    unit: DateUnit,
+    *,
+    max_chunk_bytes: int = _DEFAULT_MAX_CHUNK_BYTES,
+) -> pa.ChunkedArray:
+    """Build a PyArrow utf8 ChunkedArray from a date32 ChunkedArray.
+
+    Output chunks obey `max_chunk_bytes`, as in `format_number_column()`.
+    """
+    return _format_column(
+        column, lambda values: format_date_array(values, unit), max_chunk_bytes
+    )
+
+
+class ParseResult(NamedTuple):
+    """Output of a `parse_*_array()` function."""
+
+    array: pa.Array
+    """Parsed values. Input nulls and text that did not parse become null."""
+
+    n_invalid: int
+    """Number of non-null input values that did not parse."""
+
+
+_NUMBER_FORMAT_SPEC_PATTERN = re.compile(
+    r"\A(?:(?P<fill>.)?[<>=^])?[-+ ]?z?#?0?\d*(?P<grouping>[,_]?)(?:\.\d+)?"
+    r"(?P<type>[a-zA-Z%]?)\Z",
+    re.DOTALL,
+)
+"""Python's format-spec mini-language, parsed just enough to reverse it."""
+
+_PARSE_INT_TYPES = set("dn")
+_PARSE_FLOAT_TYPES = set("eEfFgG%")
+_INT64_MAX_DIGITS = str((1 << 63) - 1)
+_INT64_MIN_DIGITS = str(1 << 63)  # without its "-"
+
+
+class _NumberTextPattern(NamedTuple):
+    """How to read text that a NumberFormatter wrote."""
+
+    regex: str
+    """RE2 regex capturing "sign" and "number" (perhaps with separators)."""
+
+    separator: str
+    """Grouping separator to remove from "number"."""
+
+    is_int: bool
+    """True if the format only writes integers (e.g., "{:,d}")."""
+
+    is_percent: bool
+    """True if "number" is 100 times the value (e.g., "{:.1%}")."""
+
+
+def _parse_number_text_pattern(format_s: str) -> _NumberTextPattern:
+    """Build a _NumberTextPattern, or raise ValueError."""
+    prefix, format_spec, suffix = _split_number_format(format_s)
+    spec = _NUMBER_FORMAT_SPEC_PATTERN.match(format_spec)
+    type = spec.group("type")
+    if type not in _PARSE_INT_TYPES and type not in _PARSE_FLOAT_TYPES and type:
+        raise ValueError("Cannot parse numbers formatted with type %r" % type)
+    is_int = type in _PARSE_INT_TYPES
+    separator = "_" if spec.group("grouping") == "_" else ","
+    padding = r"[\s%s]*" % re.escape(spec.group("fill") or " ")
+
+    integer = r"\d{1,3}(?:%s\d{3})+|\d+" % re.escape(separator)
+    if is_int:
+        number = integer
+    else:
+        exponent = r"(?:[eE][-+]?\d+)?"
+        number = r"(?:%s)(?:\.\d*)?%s|\.\d+%s" % (integer, exponent, exponent)
+
+    regex = "^%s%s(?P<sign>[-+]?)%s(?P<number>%s)%s%s%s$" % (
+        re.escape(prefix),
+        padding,
+        padding,
+        number,
+        "%" if type == "%" else "",
+        padding,
+        re.escape(suffix),
+    )
+    return _NumberTextPattern(regex, separator, is_int, type == "%")
+
+
+def _parse_int64s(
+    digits: pa.Array, negative: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert unsigned decimal `digits` to `(int64s, ok)`.
+
+    `ok` is False where the value would not fit in int64.
+    """
+    digits = pa.compute.utf8_ltrim(digits, characters="0")
+    lengths = np.asarray(pa.compute.utf8_length(digits), dtype=np.int64)
+    as_long_as_max = lengths == len(_INT64_MAX_DIGITS)
+    # Same-length decimal strings compare like the numbers they represent
+    not_too_big = np.asarray(pa.compute.less_equal(digits, _INT64_MAX_DIGITS))
+    is_min = np.asarray(pa.compute.equal(digits, _INT64_MIN_DIGITS))
+    ok = (lengths < len(_INT64_MAX_DIGITS)) | (
+        as_long_as_max & (not_too_big | (is_min & negative))
+    )
+    # uint64 holds every value we accept, and even 2**63 (which negates to
+    # -2**63 in int64 arithmetic)
+    castable = ok & (lengths > 0)
+    uint64s = np.zeros(len(digits), dtype=np.uint64)
+    uint64s[castable] = np.asarray(
+        pa.compute.cast(digits.filter(pa.array(castable)), pa.uint64())
+    )
+    int64s = uint64s.view(np.int64)
+    np.negative(int64s, out=int64s, where=negative)
+    return int64s, ok
+
+
+def parse_number_array(arr: pa.Array, format_s: str) -> ParseResult:
+    """Parse text that `parse_number_format(format_s)` could have written.
+
+    Usage:
+
+        result = parse_number_array(pa.array(["$1,234.50", "$0.07", "?"]), "${:,.2f}")
+        result.array  # => pa.array([1234.5, 0.07, None])
+        result.n_invalid  # => 1
+
+    The input is a utf8 (or large_utf8) array. We strip the format's prefix and
+    suffix, padding and grouping separators; and we divide "%" values by 100.
+    The text needn't match the format's precision: "{:.2f}" parses "1.5".
+
+    The output is int64 for integer formats ("{:d}", "{:,d}", ...) and float64
+    for the rest. Input nulls become nulls. Other values that do not parse --
+    or, for int64, do not fit -- become nulls and are counted in `n_invalid`.
+
+    Raise ValueError if `format_s` is invalid or its type cannot be parsed
+    (for instance, "{:x}").
+    """
+    pattern = _parse_number_text_pattern(format_s)
+
+    matches = pa.compute.extract_regex(arr, pattern=pattern.regex)
+    matched = np.asarray(matches.is_valid())
+    # Unmatched rows hold "" (which does not cast); leave them out
+    sign = matches.field("sign").filter(pa.array(matched))
+    number = matches.field("number").filter(pa.array(matched))
+    number = pa.compute.replace_substring(
+        number, pattern=pattern.separator, replacement=""
+    )
+    negative = np.asarray(pa.compute.equal(sign, "-"), dtype=bool)
+
+    if pattern.is_int:
+        parsed, ok = _parse_int64s(number, negative)
+        values = np.zeros(len(arr), dtype=np.int64)
+    else:
+        parsed = np.asarray(pa.compute.cast(number, pa.float64())).copy()
+        np.negative(parsed, out=parsed, where=negative)
+        if pattern.is_percent:
+            parsed /= 100
+        ok = np.isfinite(parsed)
+        values = np.zeros(len(arr), dtype=np.float64)
+
+    valid = matched.copy()
+    valid[matched] = ok
+    values[valid] = parsed[ok]
+    n_invalid = len(arr) - arr.null_count - int(np.count_nonzero(valid))
+    return ParseResult(
+        pa.array(
+            values, mask=~valid, type=pa.int64() if pattern.is_int else pa.float64()
+        ),
+        n_invalid,
+    )
+
+
+def _extract_regex_texts(
+    arr: pa.Array, regex: str
+) -> Tuple[np.ndarray, Dict[str, pa.Array]]:
+    """Match `regex` against each row; return `(matched, {group: texts})`.
+
+    Unmatched rows and unmatched optional groups have text "".
+    """
+    matches = pa.compute.extract_regex(arr, pattern=regex)
+    matched = np.asarray(matches.is_valid())
+    texts = {
+        field.name: matches.field(field.name).fill_null("") for field in matches.type
+    }
+    return matched, texts
+
+
+def _texts_to_int64s(texts: pa.Array) -> np.ndarray:
+    """Convert decimal `texts` (which may be "") to an int64 NumPy array.
+
+    Callers' regexes restrict digit counts, so values cannot overflow.
+    """
+    present = np.asarray(pa.compute.utf8_length(texts)) > 0
+    int64s = np.zeros(len(texts), dtype=np.int64)
+    int64s[present] = np.asarray(
+        pa.compute.cast(texts.filter(pa.array(present)), pa.int64())
+    )
+    return int64s
+
+
+def _civil_is_valid(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Return True where `(year, month, day)` is a real date."""
+    days = _days_from_civil(year, month, day)
+    _, round_trip_month, round_trip_day = _civil_from_days(days)
+    # "2021-02-31" would round-trip as "2021-03-03"
+    return (
+        (month >= 1)
+        & (month <= 12)
+        & (round_trip_month == month)
+        & (round_trip_day == day)
     )
+
+
+_TIMESTAMP_TEXT_PATTERN = (
+    r"^(?P<year>-?\d{4,9})-(?P<month>\d\d)-(?P<day>\d\d)"
+    r"(?:T(?P<hour>\d\d):(?P<minute>\d\d)"
+    r"(?::(?P<second>\d\d)(?:\.(?P<fraction>\d{1,9}))?)?Z)?$"
+)
+"""RE2 regex matching `format_timestamp_array()` output."""
+
+_NS_PER_DAY = 86_400_000_000_000
+_MIN_NS = -(1 << 63)
+_MAX_NS = (1 << 63) - 1
+
+
+def parse_timestamp_array(arr: pa.Array) -> ParseResult:
+    """Parse ISO8601 text that `format_timestamp_array()` could have written.
+
+    Usage:
+
+        result = parse_timestamp_array(pa.array(["2022-08-01T12:30Z", "x"]))
+        result.array  # => timestamp("ns") array [2022-08-01 12:30:00, None]
+        result.n_invalid  # => 1
+
+    Accepted forms are "YYYY-MM-DD" (midnight), "YYYY-MM-DDTHH:MMZ",
+    "YYYY-MM-DDTHH:MM:SSZ" and "YYYY-MM-DDTHH:MM:SS.fffZ" (with 1 to 9
+    fractional digits). All are UTC.
+
+    The output is `timestamp("ns")`. Input nulls become nulls. Other values
+    that do not parse -- including impossible dates such as "2021-02-31", and
+    timestamps outside of the ~1677-2262 range that int64 nanoseconds allow --
+    become nulls and are counted in `n_invalid`.
+    """
+    matched, texts = _extract_regex_texts(arr, _TIMESTAMP_TEXT_PATTERN)
+    year, month, day, hour, minute, second, fraction = (
+        _texts_to_int64s(texts[name])
+        for name in ("year", "month", "day", "hour", "minute", "second", "fraction")
+    )
+    n_fraction_digits = np.asarray(pa.compute.utf8_length(texts["fraction"]))
+    fraction_ns = fraction * _POW10[9 - n_fraction_digits].view(np.int64)
+    time_ns = ((hour * 60 + minute) * 60 + second) * 1_000_000_000 + fraction_ns
+    days = _days_from_civil(year, month, day)
+
+    # days * _NS_PER_DAY may wrap around int64. That's fine for days we
+    # accept: their wrapped sums are correct modulo 2**64.
+    min_day = _MIN_NS // _NS_PER_DAY
+    max_day = _MAX_NS // _NS_PER_DAY
+    in_range = (
+        ((days > min_day) & (days < max_day))
+        | ((days == min_day) & (time_ns >= _MIN_NS - min_day * _NS_PER_DAY))
+        | ((days == max_day) & (time_ns <= _MAX_NS - max_day * _NS_PER_DAY))
+    )
+    valid = (
+        matched
+        & _civil_is_valid(year, month, day)
+        & (hour < 24)
+        & (minute < 60)
+        & (second < 60)
+        & in_range
+    )
+    with np.errstate(over="ignore"):
+        values = np.where(valid, days, 0) * _NS_PER_DAY + np.where(valid, time_ns, 0)
+    n_invalid = len(arr) - arr.null_count - int(np.count_nonzero(valid))
+    return ParseResult(
+        pa.array(values, mask=~valid, type=pa.timestamp("ns")), n_invalid
+    )
+
+
+_DATE_TEXT_PATTERNS = {
+    "day": r"^(?P<year>-?\d{1,7})-(?P<month>\d\d)-(?P<day>\d\d)$",
+    "week": r"^(?P<year>-?\d{1,7})-(?P<month>\d\d)-(?P<day>\d\d)$",
+    "month": r"^(?P<year>-?\d{1,7})-(?P<month>\d\d)$",
+    "quarter": r"^(?P<year>-?\d{1,7}) Q(?P<quarter>[1-4])$",
+    "year": r"^(?P<year>-?\d{1,7})$",
+}
+"""RE2 regexes matching `format_date_array()` output, per unit."""
+
+_MIN_DATE32 = -(1 << 31)
+_MAX_DATE32 = (1 << 31) - 1
+
+
+def parse_date_array(arr: pa.Array, unit: DateUnit) -> ParseResult:
+    """Parse text that `format_date_array(..., unit)` could have written.
+
+    Usage:
+
+        result = parse_date_array(pa.array(["2022 Q3", "2022-08"]), "quarter")
+        result.array  # => date32 array [2022-07-01, None]
+        result.n_invalid  # => 1
+
+    Each unit accepts only its own form: "2022-08-01" for "day" and "week",
+    "2022-08" for "month", "2022 Q3" for "quarter" and "2022" for "year".
+    Years may be negative and needn't be zero-padded.
+
+    The output is `date32`: the first day of each period. Input nulls become
+    nulls. Other values that do not parse -- including impossible dates such
+    as "2021-02-31", and (for "week") dates that are not Mondays -- become
+    nulls and are counted in `n_invalid`.
+    """
+    matched, texts = _extract_regex_texts(arr, _DATE_TEXT_PATTERNS[unit])
+    year = _texts_to_int64s(texts["year"])
+    if unit == "quarter":
+        month = _texts_to_int64s(texts["quarter"]) * 3 - 2
+    elif "month" in texts:
+        month = _texts_to_int64s(texts["month"])
+    else:
+        month = np.ones(len(arr), dtype=np.int64)
+    if "day" in texts:
+        day = _texts_to_int64s(texts["day"])
+    else:
+        day = np.ones(len(arr), dtype=np.int64)
+    days = _days_from_civil(year, month, day)
+
+    valid = (
+        matched
+        & _civil_is_valid(year, month, day)
+        & (days >= _MIN_DATE32)
+        & (days <= _MAX_DATE32)
+    )
+    if unit == "week":
+        valid &= (days + 3) % 7 == 0  # 1970-01-05 was a Monday
+    n_invalid = len(arr) - arr.null_count - int(np.count_nonzero(valid))
+    return ParseResult(
+        pa.array(
+            np.where(valid, days, 0).astype(np.int32), mask=~valid, type=pa.date32()
+        ),
+        n_invalid,
+    )
+
+
+_DEFAULT_PAGE_SIZE = 1000
+"""Default `page_size` for `FormattedColumnView`."""
+
+_DEFAULT_MAX_CACHE_BYTES = 1 << 24  # 16MB
+"""Default `max_cache_bytes` for `FormattedColumnView`."""
+
+
+def _field_format_function(field: pa.Field) -> Callable[[pa.Array], pa.Array]:
+    """Return a function that formats arrays of Workbench field `field`.
+
+    Numbers use the field's "format" metadata, and date32 uses its "unit".
+    Text (and dictionary-encoded text) becomes plain utf8.
+    """
+    type = field.type
+    if (
+        pa.types.is_integer(type)
+        or pa.types.is_floating(type)
+        or pa.types.is_decimal(type)
+    ):
+        fn = parse_number_format(field.metadata[b"format"].decode("utf-8"))
+        return lambda arr: format_number_array(arr, fn)
+    elif pa.types.is_date32(type):
+        unit = field.metadata[b"unit"].decode("utf-8")
+        return lambda arr: format_date_array(arr, unit)
+    elif pa.types.is_timestamp(type):
+        return format_timestamp_array
+    elif pa.types.is_dictionary(type):
+        return lambda arr: arr.dictionary.take(arr.indices)
+    elif pa.types.is_string(type) or pa.types.is_large_string(type):
+        return lambda arr: arr
+    else:
+        raise TypeError("Cannot format column of type %r" % type)
+
+
+class FormattedColumnView:
+    """Text of a Workbench column, formatted a page at a time as it is read.
+
+    Usage:
+
+        view = FormattedColumnView(table["A"], table.schema.field("A"))
+        view.slice(49_000_000, 200)  # => utf8 pa.Array of 200 values
+
+    `field` describes `column` as `make_column()` would: numbers have
+    "format" metadata and date32 has "unit" metadata. Timestamps are
+    formatted as ISO8601. Text (and dictionary-encoded text) is returned as-is.
+
+    `slice()` formats only the pages (of `page_size` rows) it needs. It keeps
+    recently-used pages; when their total size exceeds `max_cache_bytes`, it
+    forgets the least-recently-used ones. Reading a window of a huge column
+    costs time proportional to the window, not the column. (Text needs no
+    formatting, so text pages aren't cached.)
+    """
+
+    def __init__(
+        self,
+        column: pa.ChunkedArray,
+        field: pa.Field,
+        *,
+        page_size: int = _DEFAULT_PAGE_SIZE,
+        max_cache_bytes: int = _DEFAULT_MAX_CACHE_BYTES,
+    ):
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        self.column = column
+        self.field = field
+        self.page_size = page_size
+        self.max_cache_bytes = max_cache_bytes
+        self._format_array = _field_format_function(field)
+        self._is_text = (
+            pa.types.is_dictionary(field.type)
+            or pa.types.is_string(field.type)
+            or pa.types.is_large_string(field.type)
+        )
+        self._pages = collections.OrderedDict()  # page number => pa.StringArray
+        self._cache_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def _format_window(self, offset: int, length: int) -> pa.StringArray:
+        window = self.column.slice(offset, length)
+        formatted = [_as_utf8(self._format_array(chunk)) for chunk in window.chunks]
+        if len(formatted) == 1:
+            return formatted[0]
+        return pa.concat_arrays(formatted)
+
+    def _format_page(self, page: int) -> pa.StringArray:
+        return self._format_window(page * self.page_size, self.page_size)
+
+    def _get_page(self, page: int) -> pa.StringArray:
+        try:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+        except KeyError:
+            pass
+
+        formatted = self._format_page(page)
+        self._pages[page] = formatted
+        self._cache_bytes += formatted.nbytes
+        # Evict least-recently-used pages -- but never the one we just built
+        while self._cache_bytes > self.max_cache_bytes and len(self._pages) > 1:
+            _, evicted = self._pages.popitem(last=False)
+            self._cache_bytes -= evicted.nbytes
+        return formatted
+
+    def slice(self, offset: int = 0, length: Optional[int] = None) -> pa.StringArray:
+        """Return formatted text of rows `offset:offset+length`.
+
+        As with `pa.Array.slice()`, `length` defaults to "all remaining rows"
+        and the slice is clipped to the column's length.
+        """
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        stop = len(self) if length is None else min(len(self), offset + length)
+        if offset >= stop:
+            return pa.array([], pa.utf8())
+        if self._is_text:
+            # A zero-copy slice: caching it would cost its whole chunk's bytes
+            return self._format_window(offset, stop - offset)
+
+        first_page = offset // self.page_size
+        last_page = (stop - 1) // self.page_size
+        pieces = []
+        for page in range(first_page, last_page + 1):
+            page_start = page * self.page_size
+            start = max(offset, page_start)
+            end = min(stop, page_start + self.page_size)
+            pieces.append(self._get_page(page).slice(start - page_start, end - start))
+        if len(pieces) == 1:
+            return pieces[0]
+        return pa.concat_arrays(pieces)
+
+
+class _TextDialect(NamedTuple):
+    """How `write_table_text()` separates values and rows."""
+
+    delimiter: bytes
+    line_terminator: bytes
+
+
+_TEXT_DIALECTS = {
+    "csv": _TextDialect(b",", b"\r\n"),  # RFC 4180
+    "tsv": _TextDialect(b"\t", b"\n"),
+}
+
+_WRITE_BATCH_SIZE = 1 << 16
+"""Number of rows `write_table_text()` formats at a time, to bound RAM."""
+
+
+class _TextField(NamedTuple):
+    """One column of text, ready for `_write_text_rows()`."""
+
+    starts: np.ndarray
+    """int64 position of each value in `data`."""
+
+    lengths: np.ndarray
+    """int64 byte length of each value (before quoting)."""
+
+    data: np.ndarray
+    """uint8 UTF-8 text, with any '"' already doubled."""
+
+    quote: np.ndarray
+    """bool: True where the value must be surrounded by '"'."""
+
+
+def _text_field(arr: pa.Array, dialect: _TextDialect) -> _TextField:
+    """Escape utf8 or large_utf8 `arr` for `dialect`; null becomes ""."""
+    if arr.null_count:
+        arr = arr.fill_null("")
+    special = '[%s"\r\n]' % re.escape(dialect.delimiter.decode("utf-8"))
+    quote = pa.compute.match_substring_regex(arr, pattern=special).to_numpy(
+        zero_copy_only=False
+    )
+    if quote.any():
+        # Only quoted values contain '"'
+        arr = pa.compute.replace_substring(arr, pattern='"', replacement='""')
+
+    offset_dtype = np.dtype(
+        np.int64 if pa.types.is_large_string(arr.type) else np.int32
+    )
+    offsets = np.frombuffer(
+        arr.buffers()[1],
+        dtype=offset_dtype,
+        count=len(arr) + 1,
+        offset=arr.offset * offset_dtype.itemsize,
+    ).astype(np.int64)
+    data_buf = arr.buffers()[2]
+    data = (
+        np.empty(0, dtype=np.uint8)
+        if data_buf is None
+        else np.frombuffer(data_buf, dtype=np.uint8)
+    )
+    return _TextField(offsets[:-1], np.diff(offsets), data, quote)
+
+
+def _write_text_rows(
+    fields: List[_TextField], dialect: _TextDialect, fileobj: BinaryIO
+) -> None:
+    """Write one line per row of `fields` (which all have the same length).
+
+    We build every row of the output in one NumPy uint8 array, scattering
+    each column's bytes to their positions, then write it all at once.
+    """
+    n_rows = len(fields[0].starts)
+    widths = [field.lengths + 2 * field.quote for field in fields]
+    row_lengths = (
+        sum(widths)
+        + (len(fields) - 1) * len(dialect.delimiter)
+        + len(dialect.line_terminator)
+    )
+    row_offsets = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(row_lengths, out=row_offsets[1:])
+    out = np.empty(int(row_offsets[-1]), dtype=np.uint8)
+
+    def write_constant(positions: np.ndarray, value: bytes) -> None:
+        for i, byte in enumerate(value):
+            out[positions + i] = byte
+
+    position = row_offsets[:-1].copy()  # where we write next, on each row
+    for i, (field, width) in enumerate(zip(fields, widths)):
+        if i > 0:
+            write_constant(position, dialect.delimiter)
+            position += len(dialect.delimiter)
+        write_constant(position[field.quote], b'"')
+        value_start = position + field.quote
+        n_bytes = int(field.lengths.sum())
+        if n_bytes:
+            # Values are contiguous in field.data: copy them in one operation
+            first = int(field.starts[0])
+            destination = np.repeat(value_start - field.starts, field.lengths)
+            destination += np.arange(first, first + n_bytes)
+            out[destination] = field.data[first : first + n_bytes]
+        write_constant((value_start + field.lengths)[field.quote], b'"')
+        position += width
+    write_constant(position, dialect.line_terminator)
+
+    fileobj.write(memoryview(out))
+
+
+def write_table_text(
+    table: pa.Table, fileobj: BinaryIO, *, dialect: Literal["csv", "tsv"] = "csv"
+) -> None:
+    """Write `table` to binary `fileobj` as CSV or TSV, formatted as in Workbench.
+
+    The first line holds column names. Each value is formatted according to
+    its field, as in `FormattedColumnView`; nulls become empty values.
+
+    Values that contain the delimiter, '"' or a newline are surrounded by '"',
+    and their '"' characters are doubled. "csv" separates values with ","
+    and ends lines with "\\r\\n" (RFC 4180); "tsv" uses "\\t" and "\\n".
+
+    We format and write a batch of rows at a time, so RAM use is bounded by
+    one batch of text, not the whole table.
+    """
+    try:
+        text_dialect = _TEXT_DIALECTS[dialect]
+    except KeyError:
+        raise ValueError("dialect must be 'csv' or 'tsv'") from None
+
+    if table.num_columns == 0:
+        return
+
+    format_arrays = [_field_format_function(field) for field in table.schema]
+
+    header = [
+        _text_field(pa.array([name], pa.utf8()), text_dialect)
+        for name in table.column_names
+    ]
+    _write_text_rows(header, text_dialect, fileobj)
+
+    for batch in table.to_batches(max_chunksize=_WRITE_BATCH_SIZE):
+        if batch.num_rows == 0:
+            continue
+        fields = [
+            _text_field(format_array(column), text_dialect)
+            for format_array, column in zip(format_arrays, batch.columns)
+        ]
+        _write_text_rows(fields, text_dialect, fileobj)
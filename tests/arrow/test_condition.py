@@ -1,11 +1,24 @@
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict
 
 import numpy as np
 import pyarrow as pa
+import pyarrow.dataset
+import pyarrow.parquet
 import pytest
+import re2
 
-from cjwmodule.arrow.condition import ConditionError, condition_to_mask
+import cjwmodule.arrow.condition
+from cjwmodule.arrow.condition import (
+    ConditionError,
+    _array_regex_map_to_bool,
+    compile_condition,
+    condition_to_expression,
+    condition_to_mask,
+    filter_batches,
+    iter_condition_masks,
+)
 
 
 def NOT(condition):
@@ -68,6 +81,14 @@ def test_text_contains_empty():
     )
 
 
+def test_text_contains_empty_case_insensitive():
+    _assert_condition_mask(
+        {"A": ["a", None, "ba", ""]},
+        TEXT("contains", "A", "", case_sensitive=False),
+        "1011",
+    )
+
+
 def test_text_contains_case_insensitive():
     _assert_condition_mask(
         {"A": ["fred", "frederson", None, "maggie", "Fredrick"]},
@@ -141,6 +162,23 @@ def test_text_contains_regex_null_dictionary():
     )
 
 
+def test_text_contains_regex_low_cardinality_text():
+    # Long enough to be dictionary-encoded before we evaluate the regex
+    _assert_condition_mask(
+        {"A": ["a", "B", None, "ab"] * 2000},
+        TEXT("contains", "A", "^b", regex=True),
+        "0100" * 2000,
+    )
+
+
+def test_text_is_case_insensitive_low_cardinality_text():
+    _assert_condition_mask(
+        {"A": pa.chunked_array([["STRASSE", "x", None] * 2000, ["straße"] * 5000])},
+        TEXT("is", "A", "Straße"),
+        "100" * 2000 + "1" * 5000,
+    )
+
+
 def test_text_is():
     _assert_condition_mask(
         {"A": ["fred", "not fred", None]},
@@ -149,6 +187,26 @@ def test_text_is():
     )
 
 
+def test_text_is_case_insensitive_casefold():
+    _assert_condition_mask(
+        {"A": ["STRASSE", "Straße", "STRAẞE", "strase", None, "Strasse"]},
+        TEXT("is", "A", "straße", case_sensitive=False),
+        "111001",
+    )
+
+
+def test_text_contains_case_insensitive_casefold_chunked():
+    _assert_condition_mask(
+        {
+            "A": pa.chunked_array(
+                [["ΣΊΣΥΦΟΣ", "sisyphus"], [None, "σίσυφος", "Σίσυφος"]]
+            )
+        },
+        TEXT("contains", "A", "ΣΊΣ", case_sensitive=False),
+        "10011",
+    )
+
+
 def test_text_is_case_sensitive():
     _assert_condition_mask(
         {"A": ["Fred", "fred", "not fred", None]},
@@ -217,6 +275,28 @@ def test_text_is_empty_regex_case_sensitive():
     )
 
 
+def test_text_is_regex_alternation_matches_whole_value():
+    _assert_condition_mask(
+        {"A": ["ab", "abc", "b", "ab\n", None]},
+        TEXT("is", "A", "ab|b", regex=True, case_sensitive=True),
+        "10100",
+    )
+
+
+def test_text_contains_regex_non_ascii_sliced_chunks():
+    _assert_condition_mask(
+        {"A": pa.chunked_array([pa.array(["x", "xÉa", None, "éb"]).slice(1), ["e"]])},
+        TEXT("contains", "A", "é.", regex=True, case_sensitive=False),
+        "1010",
+    )
+
+
+def test_array_regex_map_to_bool_fallback_large_string():
+    array = pa.array(["xéa", None, "éb", "e", ""], pa.large_utf8()).slice(1)
+    result = _array_regex_map_to_bool(array, re2.compile("é.").search)
+    assert result.to_pylist() == [False, True, False, False]
+
+
 def test_cell_is_empty_number():
     _assert_condition_mask({"A": pa.array([1, 2, None])}, CELL("is_empty", "A"), "001")
 
@@ -550,3 +630,278 @@ def test_recurse():
         ),
         "000011",
     )
+
+
+def test_compile_condition_regex_parse_errors():
+    with pytest.raises(ConditionError) as excinfo:
+        compile_condition(
+            OR(TEXT("is", "A", "*", regex=True), NOT(TEXT("is", "A", "[", regex=True))),
+            pa.schema([pa.field("A", pa.utf8())]),
+        )
+
+    assert [(e.pattern, e.msg) for e in excinfo.value.errors] == [
+        ("*", "no argument for repetition operator: *"),
+        ("[", "missing ]: ["),
+    ]
+
+
+def test_compile_condition_mask_many_tables():
+    compiled = compile_condition(
+        AND(TEXT("contains", "A", "^b", regex=True), NUMBER("is_less_than", "B", 3)),
+        pa.schema([pa.field("A", pa.utf8()), pa.field("B", pa.int8())]),
+    )
+    assert compiled.mask(
+        pa.table({"A": ["a", "b", "bb"], "B": pa.array([1, 2, 3], pa.int8())})
+    ) == pa.chunked_array([[False, True, False]])
+    assert compiled.mask(
+        pa.table({"A": ["b", None], "B": pa.array([1, 1], pa.int8())})
+    ) == pa.chunked_array([[True, False]])
+
+
+def test_compile_condition_mask_record_batch():
+    compiled = compile_condition(
+        TIMESTAMP("is_after", "A", "2020-01-01"), pa.schema([("A", pa.date32())])
+    )
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array([datetime.date(2020, 1, 1), None, datetime.date(2020, 1, 2)])],
+        ["A"],
+    )
+    assert compiled.mask(batch) == pa.array([False, False, True])
+
+
+def test_compile_condition_mask_wrong_schema():
+    compiled = compile_condition(
+        NUMBER("is", "A", 1), pa.schema([pa.field("A", pa.int8())])
+    )
+    with pytest.raises(ValueError):
+        compiled.mask(pa.table({"A": pa.array([1], pa.int64())}))
+
+
+def test_and_evaluates_later_conditions_on_undecided_rows():
+    # First condition leaves 2/8 rows undecided: the regex runs on only those
+    _assert_condition_mask(
+        {
+            "A": pa.chunked_array([[1, 9, 9, 9], [9, 1, None, 9]]),
+            "B": ["ab", "ab", None, "x", "ab", "x", "ab", "ab"],
+        },
+        AND(NUMBER("is_less_than", "A", 5), TEXT("contains", "B", "^a", regex=True)),
+        "10000000",
+    )
+
+
+def test_or_evaluates_later_conditions_on_undecided_rows():
+    _assert_condition_mask(
+        {
+            "A": pa.chunked_array([[1, 1, 1, 1], [1, 9, None, 1]]),
+            "B": ["x", "x", "x", "x", "x", "ab", "x", None],
+        },
+        OR(NUMBER("is_less_than", "A", 5), TEXT("contains", "B", "^a", regex=True)),
+        "11111101",
+    )
+
+
+def test_and_or_order_does_not_change_mask_on_sampled_table():
+    # Long enough that we reorder by selectivity measured on a sample
+    n = 70000
+    table_spec = {
+        "A": pa.array(np.arange(n) % 100),
+        "B": pa.array(np.where(np.arange(n) % 7 == 0, "ab", "x")),
+    }
+    regex = TEXT("contains", "B", "^a", regex=True)
+    number = NUMBER("is_less_than", "A", 50)
+    expect = "".join("1" if i % 100 < 50 and i % 7 == 0 else "0" for i in range(n))
+    _assert_condition_mask(table_spec, AND(regex, number), expect)
+    _assert_condition_mask(table_spec, AND(number, regex), expect)
+    expect = "".join("1" if i % 100 < 50 or i % 7 == 0 else "0" for i in range(n))
+    _assert_condition_mask(table_spec, OR(regex, number), expect)
+    _assert_condition_mask(table_spec, OR(number, regex), expect)
+
+
+def test_and_or_reorder_keeps_regex_parse_error_order():
+    with pytest.raises(ConditionError) as excinfo:
+        condition_to_mask(
+            pa.table({"A": ["x"], "B": [1]}),
+            AND(
+                TEXT("is", "A", "*", regex=True),
+                NUMBER("is", "B", 1),
+                TEXT("is", "A", "[", regex=True),
+            ),
+        )
+
+    assert [e.pattern for e in excinfo.value.errors] == ["*", "["]
+
+
+def test_condition_to_mask_executor_pieces(monkeypatch):
+    monkeypatch.setattr(cjwmodule.arrow.condition, "_PARALLEL_PIECE_LENGTH", 2)
+    table = pa.table(
+        {
+            "A": pa.chunked_array([["a", "b", "a"], ["B", None]]),
+            "B": pa.chunked_array([["a", "b"], ["a", "B", None]]).dictionary_encode(),
+            "C": [1, 2, 3, 4, None],
+        }
+    )
+    with ThreadPoolExecutor(2) as executor:
+        result = condition_to_mask(
+            table,
+            OR(
+                TEXT("is", "A", "b"),
+                AND(TEXT("is", "B", "a"), NOT(NUMBER("is", "C", 1))),
+            ),
+            executor=executor,
+        )
+    assert result == pa.chunked_array([[False, True, True, True, False]])
+
+
+def test_condition_to_mask_executor_pieces_sliced_text(monkeypatch):
+    monkeypatch.setattr(cjwmodule.arrow.condition, "_PARALLEL_PIECE_LENGTH", 2)
+    table = pa.table(
+        {"A": pa.chunked_array([["a", "", None], ["", "b", None, "x"]])}
+    ).slice(1)
+    with ThreadPoolExecutor(2) as executor:
+        result = condition_to_mask(table, CELL("is_empty", "A"), executor=executor)
+    assert result.to_pylist() == [True, True, True, False, True, False]
+
+
+def test_condition_to_mask_executor_siblings():
+    table = pa.table({"A": ["a", "b", None], "B": [1, 2, 3]})
+    with ThreadPoolExecutor(2) as executor:
+        result = condition_to_mask(
+            table,
+            OR(
+                TEXT("is", "A", "^a", regex=True),
+                NUMBER("is", "B", 3),
+                CELL("is_empty", "A"),
+            ),
+            executor=executor,
+        )
+    assert result == pa.chunked_array([[True, False, True]])
+
+
+def _write_ipc_file(path, batches):
+    with pa.ipc.new_file(str(path), batches[0].schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def _ipc_stream_reader(batches):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batches[0].schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+    return pa.ipc.open_stream(sink.getvalue())
+
+
+_STREAM_BATCHES = [
+    pa.RecordBatch.from_arrays(
+        [pa.array([1, 2, 3]), pa.array(["a", "b", "c"])], ["A", "B"]
+    ),
+    pa.RecordBatch.from_arrays([pa.array([4, None]), pa.array(["d", "e"])], ["A", "B"]),
+]
+
+
+def test_iter_condition_masks_memory_mapped_ipc_file(tmp_path):
+    _write_ipc_file(tmp_path / "table.arrow", _STREAM_BATCHES)
+    with pa.memory_map(str(tmp_path / "table.arrow")) as source:
+        masks = list(
+            iter_condition_masks(
+                pa.ipc.open_file(source), NUMBER("is_greater_than", "A", 1)
+            )
+        )
+    assert masks == [pa.array([False, True, True]), pa.array([True, False])]
+
+
+def test_iter_condition_masks_raise_condition_error_before_reading():
+    with pytest.raises(ConditionError):
+        iter_condition_masks(
+            _ipc_stream_reader(_STREAM_BATCHES), TEXT("is", "B", "*", regex=True)
+        )
+
+
+def test_filter_batches_stream():
+    batches = list(
+        filter_batches(
+            _ipc_stream_reader(_STREAM_BATCHES),
+            OR(NUMBER("is_less_than", "A", 2), TEXT("is", "B", "e")),
+        )
+    )
+    assert [batch.to_pydict() for batch in batches] == [
+        {"A": [1], "B": ["a"]},
+        {"A": [None], "B": ["e"]},
+    ]
+
+
+def _scan_with_condition_expression(table, condition):
+    dataset = pyarrow.dataset.dataset(table)
+    expression, residual = condition_to_expression(condition, dataset.schema)
+    result = dataset.to_table(filter=expression)
+    if residual is not None:
+        result = result.filter(condition_to_mask(result, residual))
+    return result.to_pydict(), residual
+
+
+def test_condition_to_expression_pushes_down_everything():
+    table = pa.table(
+        {
+            "A": pa.array([1, 2, None], pa.int8()),
+            "B": ["x", "y", "x"],
+            "C": pa.array([datetime.date(2020, 1, 1), None, datetime.date(2021, 1, 1)]),
+        }
+    )
+    assert _scan_with_condition_expression(
+        table,
+        OR(
+            AND(NUMBER("is_greater_than", "A", 1.5), TEXT("is", "B", "y", True)),
+            TIMESTAMP("is_after", "C", "2020-06-01"),
+        ),
+    ) == (
+        {"A": [2, None], "B": ["y", "x"], "C": [None, datetime.date(2021, 1, 1)]},
+        None,
+    )
+
+
+def test_condition_to_expression_not_includes_nulls():
+    table = pa.table({"A": [1, 2, None]})
+    assert _scan_with_condition_expression(
+        table, NOT(NUMBER("is_greater_than", "A", 1))
+    ) == ({"A": [1, None]}, None)
+
+
+def test_condition_to_expression_parquet_float_nan(tmp_path):
+    # Statistics say the first row group holds only 2.0
+    table = pa.table({"A": [2.0, float("nan"), 2.0, 1.0, None, float("nan")]})
+    pyarrow.parquet.write_table(table, tmp_path / "a.parquet", row_group_size=3)
+    dataset = pyarrow.dataset.dataset(tmp_path / "a.parquet")
+    condition = NOT(OR(NUMBER("is_greater_than", "A", 1), NUMBER("is", "A", 1)))
+    expression, residual = condition_to_expression(condition, dataset.schema)
+    result = dataset.to_table(filter=expression)
+    if residual is not None:
+        result = result.filter(condition_to_mask(result, residual))
+    expected = table.filter(condition_to_mask(table, condition))
+    assert result.num_rows == 3
+    assert str(result.to_pydict()) == str(expected.to_pydict())
+
+
+def test_condition_to_expression_and_residual():
+    table = pa.table({"A": [1, 2, 3], "B": ["x", "Y", "y"]})
+    regex = TEXT("is", "B", "y", regex=True)
+    assert _scan_with_condition_expression(
+        table, AND(NUMBER("is_less_than", "A", 3), regex)
+    ) == ({"A": [2], "B": ["Y"]}, regex)
+
+
+def test_condition_to_expression_or_residual():
+    table = pa.table({"A": [1, 2, 3], "B": ["x", "Y", "y"]})
+    condition = OR(
+        NUMBER("is", "A", 1), AND(NUMBER("is", "A", 3), TEXT("is", "B", "Y"))
+    )
+    assert _scan_with_condition_expression(table, condition) == (
+        {"A": [1, 3], "B": ["x", "y"]},
+        condition,
+    )
+
+
+def test_condition_to_expression_regex_parse_error():
+    with pytest.raises(ConditionError):
+        condition_to_expression(
+            TEXT("is", "A", "*", regex=True), pa.schema([pa.field("A", pa.utf8())])
+        )
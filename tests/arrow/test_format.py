@@ -1,15 +1,29 @@
 import datetime
+import decimal
+import io
 import math
+from multiprocessing import shared_memory
 
+import numpy as np
 import pyarrow as pa
 import pytest
 
+import cjwmodule.arrow.format
 from cjwmodule.arrow.format import (
+    FormattedColumnView,
     format_date_array,
+    format_date_column,
     format_number_array,
+    format_number_column,
     format_timestamp_array,
+    format_timestamp_column,
+    parse_date_array,
+    parse_number_array,
     parse_number_format,
+    parse_timestamp_array,
+    write_table_text,
 )
+from cjwmodule.arrow.testing import make_column, make_table
 
 
 def test_parse_disallow_too_many_arguments():
@@ -80,6 +94,22 @@ def test_format_typeerror():
         parse_number_format(b"{:,}")
 
 
+def test_format_typeerror_unhashable():
+    with pytest.raises(TypeError, match="Format must be str"):
+        parse_number_format(["{:,}"])
+
+
+def test_parse_number_format_is_cached():
+    assert parse_number_format("{:,.2f}") is parse_number_format("{:,.2f}")
+    assert parse_number_format("{:,.2f}") is not parse_number_format("{:,.3f}")
+
+
+def test_parse_number_format_invalid_is_not_cached():
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Unknown format code 'T'"):
+            parse_number_format("{:T}")
+
+
 def test_format_suffix():
     f = parse_number_format("{:,d} cows")
     assert f(2) == "2 cows"
@@ -205,6 +235,70 @@ def test_format_timestamp_no_valid_buf():
     assert format_timestamp_array(scary_arr).to_pylist() == ["2010-01-01"]
 
 
+def test_format_timestamp_unit_s():
+    assert format_timestamp_array(
+        pa.array([0, 86_400, 3_600, 61, -1, None], pa.timestamp("s"))
+    ).to_pylist() == [
+        "1970-01-01",
+        "1970-01-02",
+        "1970-01-01T01:00Z",
+        "1970-01-01T00:01:01Z",
+        "1969-12-31T23:59:59Z",
+        None,
+    ]
+
+
+def test_format_timestamp_unit_ms():
+    assert format_timestamp_array(
+        pa.array([1, -1, 60_000], pa.timestamp("ms"))
+    ).to_pylist() == [
+        "1970-01-01T00:00:00.001Z",
+        "1969-12-31T23:59:59.999Z",
+        "1970-01-01T00:01Z",
+    ]
+
+
+def test_format_timestamp_unit_us():
+    assert format_timestamp_array(
+        pa.array([1, 1_000, 1_001_000], pa.timestamp("us"))
+    ).to_pylist() == [
+        "1970-01-01T00:00:00.000001Z",
+        "1970-01-01T00:00:00.001Z",
+        "1970-01-01T00:00:01.001Z",
+    ]
+
+
+def test_format_timestamp_years_datetime_does_not_support():
+    assert format_timestamp_array(
+        pa.array(
+            [
+                -62_135_596_800,  # 0001-01-01
+                -62_135_596_801,  # 0000-12-31T23:59:59
+                -62_198_755_200,  # -0001-01-01
+                253_402_300_800,  # 10000-01-01
+            ],
+            pa.timestamp("s"),
+        )
+    ).to_pylist() == [
+        "0001-01-01",
+        "0000-12-31T23:59:59Z",
+        "-0001-01-01",
+        "10000-01-01",
+    ]
+
+
+def test_format_timestamp_with_timezone_is_utc():
+    assert (
+        format_timestamp_array(
+            pa.array(
+                [datetime.datetime(2021, 4, 1, 12, 30), None],
+                pa.timestamp("ns", tz="America/Montreal"),
+            )
+        ).to_pylist()
+        == ["2021-04-01T12:30Z", None]
+    )
+
+
 def test_format_date_day():
     assert format_date_array(
         pa.array([datetime.date(2010, 1, 1), datetime.date(1900, 11, 30), None]), "day"
@@ -247,3 +341,797 @@ def test_format_date_year():
     assert format_date_array(
         pa.array([datetime.date(2021, 1, 1), datetime.date(1950, 1, 1), None]), "year"
     ).to_pylist() == ["2021", "1950", None]
+
+
+_COMMON_NUMBER_FORMATS = [
+    "{}",
+    "{:,}",
+    "{:d}",
+    "{:,d}",
+    "{:.2f}",
+    "{:,.2f}",
+    "${:,.2f}",
+    "{:,.0f}",
+    "{:f}",
+    "{:.1%}",
+    "{:,%}",
+    "{:,.3f} €",
+    "{:,d} cows",
+]
+
+
+def _assert_fast_path_matches_per_value(arr: pa.Array) -> None:
+    for format_s in _COMMON_NUMBER_FORMATS:
+        fn = parse_number_format(format_s)
+        assert fn.fast_format is not None
+        expected = [
+            None if v is None or not math.isfinite(v) else fn(v)
+            for v in arr.to_pylist()
+        ]
+        assert format_number_array(arr, fn).to_pylist() == expected, format_s
+
+
+def test_format_number_array_fast_path_int8():
+    _assert_fast_path_matches_per_value(
+        pa.array([0, 1, -1, 127, -128, None], pa.int8())
+    )
+
+
+def test_format_number_array_fast_path_int64():
+    _assert_fast_path_matches_per_value(
+        pa.array(
+            [0, -1, 999, -1000, 2 ** 53 + 1, 2 ** 63 - 1, -(2 ** 63), None], pa.int64()
+        )
+    )
+
+
+def test_format_number_array_fast_path_uint64():
+    _assert_fast_path_matches_per_value(
+        pa.array([0, 1, 999, 1000, 2 ** 64 - 1, None], pa.uint64())
+    )
+
+
+_TRICKY_FLOATS = [
+    0.0,
+    -0.0,
+    0.5,
+    1.5,
+    2.5,
+    -0.5,
+    1.005,  # really 1.00499999999999989...: rounds down
+    0.125,
+    0.045,
+    9.995,
+    -1234567.891,
+    1e-7,
+    2.0 ** 53 + 2,
+    2.0 ** 63,
+    -(2.0 ** 63),
+    1e300,
+    None,
+    math.nan,
+    math.inf,
+]
+
+
+def test_format_number_array_fast_path_float64():
+    _assert_fast_path_matches_per_value(pa.array(_TRICKY_FLOATS, pa.float64()))
+
+
+def test_format_number_array_fast_path_float32():
+    _assert_fast_path_matches_per_value(pa.array(_TRICKY_FLOATS, pa.float32()))
+
+
+def test_format_number_array_fractional_floats_skip_blocks(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("formatted blocks of fallback rows")
+
+    monkeypatch.setattr(cjwmodule.arrow.format, "_format_blocks", fail)
+    assert (
+        format_number_array(
+            pa.array([1.5, -2.25, None, math.nan, 3.0, 1234.5, 0.1]),
+            parse_number_format("{:,}"),
+        ).to_pylist()
+        == ["1.5", "-2.25", None, None, "3", "1,234.5", "0.1"]
+    )
+
+
+_TRICKY_DECIMALS = [
+    "0",
+    "1.50",
+    "-0.50",
+    "-0.001",
+    "1.235",
+    "1.245",
+    "0.125",
+    "12345678.90",
+    "-9223372036854775.808",  # smallest int64 coefficient
+    "9007199254740993",  # 2**53 + 1: float() rounds it
+    "123456789012345678901234567890.123",  # coefficient > int64
+    None,
+]
+
+
+def test_format_number_array_decimal128():
+    values = [None if v is None else decimal.Decimal(v) for v in _TRICKY_DECIMALS]
+    _assert_fast_path_matches_per_value(pa.array(values, pa.decimal128(38, 3)))
+    values.append(decimal.Decimal("0.0000001"))  # "{}" uses scientific notation
+    _assert_fast_path_matches_per_value(pa.array(values, pa.decimal128(38, 7)))
+
+
+def test_format_number_array_decimal256():
+    values = [None if v is None else decimal.Decimal(v) for v in _TRICKY_DECIMALS]
+    _assert_fast_path_matches_per_value(pa.array(values, pa.decimal256(60, 3)).slice(1))
+
+
+def test_format_number_array_decimal_exotic_format():
+    arr = pa.array([decimal.Decimal("1.50"), None], pa.decimal128(5, 2))
+    assert format_number_array(arr, parse_number_format("{:e}")).to_pylist() == [
+        "1.50e+0",
+        None,
+    ]
+
+
+def test_format_number_array_float16_exotic_format():
+    arr = pa.array(np.array([1.5, -2.25, np.nan], dtype=np.float16))
+    assert format_number_array(arr, parse_number_format("{:e}")).to_pylist() == [
+        "1.500000e+00",
+        "-2.250000e+00",
+        None,
+    ]
+
+
+def test_format_number_array_exotic_format_has_no_fast_path():
+    fn = parse_number_format("{:+08.3e}")
+    assert fn.fast_format is None
+    assert format_number_array(pa.array([1.5, None]), fn).to_pylist() == [
+        "+1.500e+00",
+        None,
+    ]
+
+
+def test_format_number_array_fast_path_empty():
+    assert (
+        format_number_array(
+            pa.array([], pa.int64()), parse_number_format("{:,}")
+        ).to_pylist()
+        == []
+    )
+
+
+def test_format_number_array_fast_path_many_blocks():
+    arr = pa.array(range(-100_000, 100_000, 3), pa.int32())
+    fn = parse_number_format("{:,d}")
+    assert format_number_array(arr, fn).to_pylist() == [
+        format(v, ",d") for v in range(-100_000, 100_000, 3)
+    ]
+
+
+def test_format_number_array_fast_path_buffers_are_exact_size():
+    arr = pa.array([1, None, -23456, 7], pa.int64())
+    result = format_number_array(arr, parse_number_format("{:,d}"))
+    result.validate(full=True)
+    assert result.to_pylist() == ["1", None, "-23,456", "7"]
+    assert result.buffers()[2].size == len("1-23,4567")
+
+
+def test_format_number_array_deduplicate():
+    assert (
+        format_number_array(
+            pa.array([2021, None, 2020, 2021, 2021], pa.int32()),
+            parse_number_format("{:d}"),
+            deduplicate=True,
+        ).to_pylist()
+        == ["2021", None, "2020", "2021", "2021"]
+    )
+
+
+def test_format_number_array_dictionary():
+    result = format_number_array(
+        pa.array([1.2, 1.7, None, math.nan, 3.0, 1.2], pa.float64()),
+        parse_number_format("{:d}"),
+        dictionary=True,
+    )
+    assert pa.types.is_dictionary(result.type)
+    # 1.2 and 1.7 both format as "1": no duplicates. NaN is null: no unused.
+    assert result.dictionary.to_pylist() == ["1", "3"]
+    assert result.to_pylist() == ["1", "1", None, None, "3", "1"]
+
+
+def test_format_timestamp_array_dictionary():
+    result = format_timestamp_array(
+        pa.array(
+            [datetime.datetime(2021, 1, 1), None, datetime.datetime(2021, 1, 1)],
+            pa.timestamp("ns"),
+        ),
+        dictionary=True,
+    )
+    assert result.dictionary.to_pylist() == ["2021-01-01"]
+    assert result.to_pylist() == ["2021-01-01", None, "2021-01-01"]
+
+
+def test_format_date_array_dictionary():
+    result = format_date_array(
+        pa.array(
+            [datetime.date(2021, 1, 1), datetime.date(2021, 2, 1), None],
+            pa.date32(),
+        ),
+        "year",
+        dictionary=True,
+    )
+    assert result.dictionary.to_pylist() == ["2021"]
+    assert result.to_pylist() == ["2021", "2021", None]
+
+
+def test_format_date_array_deduplicate():
+    assert (
+        format_date_array(
+            pa.array([datetime.date(2021, 4, 1), None, datetime.date(2021, 4, 1)]),
+            "quarter",
+            deduplicate=True,
+        ).to_pylist()
+        == ["2021 Q2", None, "2021 Q2"]
+    )
+
+
+def test_format_number_column():
+    result = format_number_column(
+        pa.chunked_array([[1, 2, None], [], [1234]], pa.int64()),
+        parse_number_format("{:,}"),
+    )
+    assert result.type == pa.utf8()
+    assert result.to_pylist() == ["1", "2", None, "1,234"]
+
+
+def test_format_number_column_empty():
+    result = format_number_column(
+        pa.chunked_array([], pa.int64()), parse_number_format("{:,}")
+    )
+    assert result.type == pa.utf8()
+    assert result.num_chunks == 0
+
+
+def test_format_number_column_max_chunk_bytes():
+    values = list(range(10_000))
+    result = format_number_column(
+        pa.chunked_array([values[:7_000], values[7_000:]], pa.int32()),
+        parse_number_format("{:,d}"),
+        max_chunk_bytes=1_000,
+    )
+    assert result.to_pylist() == [format(v, ",d") for v in values]
+    assert result.num_chunks > 50
+    for chunk in result.chunks:
+        assert sum(len(v) for v in chunk.to_pylist()) + 4 * len(chunk) <= 1_000
+
+
+def test_format_number_column_max_chunk_bytes_smaller_than_value():
+    result = format_number_column(
+        pa.chunked_array([[1_000_000, 2_000_000]], pa.int32()),
+        parse_number_format("{:,d}"),
+        max_chunk_bytes=1,
+    )
+    assert [chunk.to_pylist() for chunk in result.chunks] == [
+        ["1,000,000"],
+        ["2,000,000"],
+    ]
+
+
+def test_format_timestamp_column():
+    result = format_timestamp_column(
+        pa.chunked_array(
+            [[datetime.datetime(2021, 1, 1), None], [datetime.datetime(2021, 1, 2)]],
+            pa.timestamp("ns"),
+        ),
+        max_chunk_bytes=20,
+    )
+    assert result.num_chunks > 1
+    assert result.to_pylist() == ["2021-01-01", None, "2021-01-02"]
+
+
+def test_format_date_column():
+    result = format_date_column(
+        pa.chunked_array([[datetime.date(2021, 1, 1), None]], pa.date32()), "month"
+    )
+    assert result.to_pylist() == ["2021-01", None]
+
+
+def test_format_number_array_large_utf8_when_offsets_overflow(monkeypatch):
+    monkeypatch.setattr(cjwmodule.arrow.format, "_MAX_UTF8_BYTES", 6)
+    result = format_number_array(
+        pa.array([1000, None, 2000], pa.int64()), parse_number_format("{:,}")
+    )
+    assert result.type == pa.large_utf8()
+    assert result.to_pylist() == ["1,000", None, "2,000"]
+
+
+def test_format_number_array_exotic_large_utf8_when_offsets_overflow(monkeypatch):
+    monkeypatch.setattr(cjwmodule.arrow.format, "_MAX_UTF8_BYTES", 6)
+    result = format_number_array(
+        pa.array([1.0, None, 2.0]), parse_number_format("{:.2e}")
+    )
+    assert result.type == pa.large_utf8()
+    assert result.to_pylist() == ["1.00e+00", None, "2.00e+00"]
+
+
+def test_format_timestamp_array_large_utf8_when_offsets_overflow(monkeypatch):
+    monkeypatch.setattr(cjwmodule.arrow.format, "_MAX_UTF8_BYTES", 10)
+    result = format_timestamp_array(
+        pa.array(
+            [datetime.datetime(2021, 1, 1), datetime.datetime(2021, 1, 2)],
+            pa.timestamp("ns"),
+        )
+    )
+    assert result.type == pa.large_utf8()
+    assert result.to_pylist() == ["2021-01-01", "2021-01-02"]
+
+
+def test_format_date_array_large_utf8_when_offsets_overflow(monkeypatch):
+    monkeypatch.setattr(cjwmodule.arrow.format, "_MAX_UTF8_BYTES", 4)
+    result = format_date_array(
+        pa.array([datetime.date(2021, 1, 1), datetime.date(2022, 1, 1)]), "year"
+    )
+    assert result.type == pa.large_utf8()
+    assert result.to_pylist() == ["2021", "2022"]
+
+
+def test_split_large_utf8_into_utf8_chunks_sharing_data():
+    arr = pa.array(["a", None, "bcd", "ef", "ghijk", ""], pa.large_utf8()).slice(1)
+    chunks = list(cjwmodule.arrow.format._split_string_array(arr, 12))
+    assert [chunk.type for chunk in chunks] == [pa.utf8()] * len(chunks)
+    assert [chunk.to_pylist() for chunk in chunks] == [
+        [None, "bcd"],
+        ["ef"],
+        ["ghijk"],
+        [""],
+    ]
+    assert chunks[1].buffers()[2].address == arr.buffers()[2].address + 4
+
+
+def test_format_date_negative_and_far_years():
+    assert format_date_array(
+        pa.array(
+            [
+                -719_162,  # 0001-01-01
+                -719_163,  # 0000-12-31
+                -719_893,  # -0001-01-01
+                2_932_897,  # 10000-01-01
+                -(2 ** 31),
+            ],
+            pa.date32(),
+        ),
+        "day",
+    ).to_pylist() == [
+        "1-01-01",
+        "0-12-31",
+        "-1-01-01",
+        "10000-01-01",
+        "-5877641-06-23",
+    ]
+
+
+def test_format_date_quarter_negative_year():
+    assert format_date_array(
+        pa.array([-719_893], pa.date32()), "quarter"
+    ).to_pylist() == ["-1 Q1"]
+
+
+def test_format_number_array_sliced():
+    values = [None if i % 5 == 3 else i * 1001 for i in range(40)]
+    arr = pa.array(values, pa.int64())
+    fn = parse_number_format("{:,d}")
+    for offset, length in [(0, 40), (3, 20), (8, 17), (13, 0), (39, 1)]:
+        assert format_number_array(arr.slice(offset, length), fn).to_pylist() == [
+            None if v is None else format(v, ",d")
+            for v in values[offset : offset + length]
+        ]
+
+
+def test_format_number_array_exotic_format_sliced():
+    values = [None if i % 5 == 3 else i * 1.5 for i in range(40)]
+    arr = pa.array(values, pa.float64())
+    fn = parse_number_format("{:e}")
+    for offset, length in [(0, 40), (3, 20), (8, 17), (13, 0), (39, 1)]:
+        assert format_number_array(arr.slice(offset, length), fn).to_pylist() == [
+            None if v is None else format(v, "e")
+            for v in values[offset : offset + length]
+        ]
+
+
+def test_format_number_array_exotic_format_sliced_no_validity_buffer():
+    arr = pa.array([1.0, 2.0, 3.0, float("nan"), 5.0]).slice(2)
+    assert arr.buffers()[0] is None
+    result = format_number_array(arr, parse_number_format("{:e}"))
+    assert result.to_pylist() == ["3.000000e+00", None, "5.000000e+00"]
+
+
+def test_format_number_array_sliced_deduplicate():
+    arr = pa.array([1, 2, None, 2, 3, 1], pa.int8()).slice(1, 4)
+    result = format_number_array(arr, parse_number_format("{:e}"), dictionary=True)
+    assert result.to_pylist() == ["2.000000e+00", None, "2.000000e+00", "3.000000e+00"]
+
+
+def test_format_timestamp_array_sliced():
+    arr = pa.array(
+        [0, None, 1_500_000_000, 86_400_000_000_000, None, 1], pa.timestamp("ns")
+    ).slice(1, 4)
+    assert format_timestamp_array(arr).to_pylist() == [
+        None,
+        "1970-01-01T00:00:01.500Z",
+        "1970-01-02",
+        None,
+    ]
+
+
+def test_format_date_array_sliced():
+    arr = pa.array([0, None, 31, 365, None, 59], pa.date32()).slice(3)
+    assert format_date_array(arr, "month").to_pylist() == ["1971-01", None, "1970-03"]
+
+
+def test_format_number_column_sliced_chunks():
+    column = pa.chunked_array([list(range(1000))], pa.int32()).slice(250, 500)
+    result = format_number_column(
+        column, parse_number_format("{:e}"), max_chunk_bytes=500
+    )
+    assert result.to_pylist() == [format(v, "e") for v in range(250, 750)]
+
+
+def test_parse_number_array_float():
+    result = parse_number_array(
+        pa.array(["$1,234.50", "$0.07", None, "$-3", "-$3", "$.5", "$1e3", "1.00"]),
+        "${:,.2f}",
+    )
+    assert result.array.type == pa.float64()
+    assert result.array.to_pylist() == [
+        1234.5,
+        0.07,
+        None,
+        -3.0,
+        None,
+        0.5,
+        1000.0,
+        None,
+    ]
+    assert result.n_invalid == 2
+
+
+def test_parse_number_array_int():
+    result = parse_number_array(
+        pa.array(
+            [
+                "1,234",
+                "-9,223,372,036,854,775,808",
+                "9223372036854775807",
+                "9223372036854775808",  # overflow
+                "0012",
+                "1.5",
+                "",
+            ]
+        ),
+        "{:,d}",
+    )
+    assert result.array.type == pa.int64()
+    assert result.array.to_pylist() == [
+        1234,
+        -9223372036854775808,
+        9223372036854775807,
+        None,
+        12,
+        None,
+        None,
+    ]
+    assert result.n_invalid == 3
+
+
+def test_parse_number_array_percent():
+    result = parse_number_array(pa.array(["12.5%", "-7%", "7", "100.0%"]), "{:.1%}")
+    assert result.array.to_pylist() == [0.125, -0.07, None, 1.0]
+    assert result.n_invalid == 1
+
+
+def test_parse_number_array_padding_and_suffix():
+    result = parse_number_array(
+        pa.array(["****1_234.000 cows", "  -2.5 cows", "3 cows!"]),
+        "{:*>12_.3f} cows",
+    )
+    assert result.array.to_pylist() == [1234.0, -2.5, None]
+
+
+def test_parse_number_array_sliced_large_utf8():
+    arr = pa.array(["1", None, "x", "2"], pa.large_utf8()).slice(1)
+    result = parse_number_array(arr, "{:,}")
+    assert result.array.to_pylist() == [None, None, 2.0]
+    assert result.n_invalid == 1
+
+
+def test_parse_number_array_round_trip():
+    fn = parse_number_format("${:,.2f}")
+    arr = pa.array([1234567.891, -0.5, None, 3.0, 1e15])
+    text = format_number_array(arr, fn)
+    result = parse_number_array(text, "${:,.2f}")
+    assert result.n_invalid == 0
+    assert format_number_array(result.array, fn).equals(text)
+
+
+def test_parse_number_array_unsupported_type():
+    with pytest.raises(
+        ValueError, match="Cannot parse numbers formatted with type 'x'"
+    ):
+        parse_number_array(pa.array(["ff"]), "{:x}")
+
+
+def test_parse_number_array_invalid_format():
+    with pytest.raises(ValueError, match="Can only format one number"):
+        parse_number_array(pa.array(["1"]), "{:d}{:d}")
+
+
+def test_parse_timestamp_array():
+    result = parse_timestamp_array(
+        pa.array(
+            [
+                "2022-08-01T12:30Z",
+                "2022-08-01",
+                None,
+                "1970-01-01T00:00:01.5Z",
+                "1970-01-01T00:00:00.000000001Z",
+                "2022-08-01T12:30",  # no "Z"
+                "2021-02-29",  # not a leap year
+                "2022-08-01T24:00Z",
+                "",
+            ]
+        )
+    )
+    assert result.array.type == pa.timestamp("ns")
+    assert result.array.cast(pa.int64()).to_pylist() == [
+        1659357000_000000000,
+        1659312000_000000000,
+        None,
+        1_500_000_000,
+        1,
+        None,
+        None,
+        None,
+        None,
+    ]
+    assert result.n_invalid == 4
+
+
+def test_parse_timestamp_array_int64_limits():
+    result = parse_timestamp_array(
+        pa.array(
+            [
+                "2262-04-11T23:47:16.854775807Z",
+                "2262-04-11T23:47:16.854775808Z",
+                "1677-09-21T00:12:43.145224192Z",
+                "1677-09-21T00:12:43.145224191Z",
+                "-0001-01-01",
+            ]
+        )
+    )
+    assert result.array.cast(pa.int64()).to_pylist() == [
+        (1 << 63) - 1,
+        None,
+        -(1 << 63),
+        None,
+        None,
+    ]
+    assert result.n_invalid == 3
+
+
+def test_parse_timestamp_array_round_trip():
+    arr = pa.array(
+        [0, None, 1, -1, 1_500_000_000, 86_400_000_000_000, -(1 << 63)],
+        pa.timestamp("ns"),
+    )
+    result = parse_timestamp_array(format_timestamp_array(arr))
+    assert result.n_invalid == 0
+    assert result.array.equals(arr)
+
+
+def test_parse_date_array_day():
+    result = parse_date_array(
+        pa.array(["2022-08-01", "2020-02-29", "2021-02-29", "2022-08", None]), "day"
+    )
+    assert result.array.type == pa.date32()
+    assert result.array.to_pylist() == [
+        datetime.date(2022, 8, 1),
+        datetime.date(2020, 2, 29),
+        None,
+        None,
+        None,
+    ]
+    assert result.n_invalid == 2
+
+
+def test_parse_date_array_week_must_be_monday():
+    result = parse_date_array(pa.array(["2022-08-01", "2022-08-02"]), "week")
+    assert result.array.to_pylist() == [datetime.date(2022, 8, 1), None]
+    assert result.n_invalid == 1
+
+
+def test_parse_date_array_month_quarter_year():
+    assert parse_date_array(
+        pa.array(["2022-08", "2022-13"]), "month"
+    ).array.to_pylist() == [
+        datetime.date(2022, 8, 1),
+        None,
+    ]
+    assert parse_date_array(
+        pa.array(["2022 Q3", "2022 Q5"]), "quarter"
+    ).array.to_pylist() == [
+        datetime.date(2022, 7, 1),
+        None,
+    ]
+    assert parse_date_array(
+        pa.array(["2022", "22", "2022 Q1"]), "year"
+    ).array.to_pylist() == [
+        datetime.date(2022, 1, 1),
+        datetime.date(22, 1, 1),
+        None,
+    ]
+
+
+def test_parse_date_array_round_trip_negative_years():
+    arr = pa.array([-719893, -719528, 0, None, 2932896], pa.date32())
+    result = parse_date_array(format_date_array(arr, "day"), "day")
+    assert result.n_invalid == 0
+    assert result.array.equals(arr)
+    result = parse_date_array(pa.array(["-1", "0", "5"]), "year")
+    assert result.array.equals(pa.array([-719893, -719528, -717701], pa.date32()))
+
+
+def test_format_number_array_workers():
+    values = [None if i % 7 == 3 else i * 1.5 for i in range(1003)]
+    arr = pa.array(values).slice(5)
+    fn = parse_number_format("{:e}")
+    result = format_number_array(arr, fn, workers=2)
+    result.validate(full=True)
+    assert result.equals(format_number_array(arr, fn))
+
+
+def test_format_number_array_workers_error_unlinks_shared_memory(monkeypatch):
+    names = []
+
+    class RecordingSharedMemory(shared_memory.SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            names.append(self.name)
+
+    monkeypatch.setattr(shared_memory, "SharedMemory", RecordingSharedMemory)
+    # "{:c}" fails on the last worker's range only
+    arr = pa.array([65] * 100 + [1 << 40], pa.int64())
+    with pytest.raises(OverflowError):
+        format_number_array(arr, parse_number_format("{:c}"), workers=3)
+    monkeypatch.undo()
+    assert len(names) == 3  # input, and the two successful workers' outputs
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_format_number_array_workers_require_format_s():
+    with pytest.raises(ValueError, match="workers requires a fn"):
+        format_number_array(pa.array([1, 2]), lambda v: str(v), workers=2)
+
+
+def test_format_number_array_workers_must_be_positive():
+    with pytest.raises(ValueError, match="workers must be positive"):
+        format_number_array(pa.array([1]), parse_number_format("{:d}"), workers=0)
+
+
+def test_formatted_column_view_number():
+    column = pa.chunked_array([list(range(0, 7)), list(range(7, 25))], pa.int64())
+    field = pa.field("A", pa.int64(), metadata={"format": "{:,d}!"})
+    view = FormattedColumnView(column, field, page_size=4)
+    assert len(view) == 25
+    assert view.slice(5, 6).to_pylist() == ["5!", "6!", "7!", "8!", "9!", "10!"]
+    assert view.slice(23).to_pylist() == ["23!", "24!"]
+    assert view.slice(30, 2).to_pylist() == []
+    assert view.slice().to_pylist() == ["%d!" % i for i in range(25)]
+
+
+def test_formatted_column_view_formats_only_needed_pages(monkeypatch):
+    column = pa.chunked_array([list(range(10_000))], pa.float64())
+    field = pa.field("A", pa.float64(), metadata={"format": "{:.1f}"})
+    view = FormattedColumnView(column, field, page_size=100)
+    calls = []
+    format_page = view._format_page
+    monkeypatch.setattr(
+        view, "_format_page", lambda p: calls.append(p) or format_page(p)
+    )
+    assert view.slice(5050, 100).to_pylist() == ["%d.0" % i for i in range(5050, 5150)]
+    assert view.slice(5060, 10).to_pylist() == ["%d.0" % i for i in range(5060, 5070)]
+    assert calls == [50, 51]  # second slice came from cache
+
+
+def test_formatted_column_view_evicts_least_recently_used_page():
+    column = pa.chunked_array([list(range(1000))], pa.int32())
+    field = pa.field("A", pa.int32(), metadata={"format": "{:d}"})
+    view = FormattedColumnView(column, field, page_size=100, max_cache_bytes=1000)
+    # Each page is over 500 bytes (text and offsets), so only one fits
+    view.slice(0, 1)
+    view.slice(500, 1)
+    assert list(view._pages) == [5]
+    assert view.slice(0, 2).to_pylist() == ["0", "1"]
+    assert list(view._pages) == [0]
+
+
+def test_formatted_column_view_text_is_not_cached():
+    column = pa.chunked_array([["a" * 1000] * 10, ["b", None]])
+    view = FormattedColumnView(column, pa.field("A", pa.utf8()), max_cache_bytes=10)
+    assert view.slice(9, 3).to_pylist() == ["a" * 1000, "b", None]
+    assert len(view._pages) == 0
+
+
+def test_formatted_column_view_date_timestamp_text():
+    dates = pa.chunked_array([pa.array([0, None, 59], pa.date32())])
+    assert FormattedColumnView(
+        dates, pa.field("A", pa.date32(), metadata={"unit": "month"})
+    ).slice(1).to_pylist() == [None, "1970-03"]
+    timestamps = pa.chunked_array([pa.array([0, 1_000_000_000], pa.timestamp("ns"))])
+    assert FormattedColumnView(
+        timestamps, pa.field("A", pa.timestamp("ns"))
+    ).slice().to_pylist() == ["1970-01-01", "1970-01-01T00:00:01Z"]
+    text = pa.chunked_array([pa.array(["a", "b", None, "a"]).dictionary_encode()])
+    assert FormattedColumnView(text, pa.field("A", text.type)).slice(
+        1, 2
+    ).to_pylist() == [
+        "b",
+        None,
+    ]
+
+
+def _write_table_text(table, **kwargs):
+    out = io.BytesIO()
+    write_table_text(table, out, **kwargs)
+    return out.getvalue()
+
+
+def test_write_table_text_csv():
+    table = make_table(
+        make_column("A", [1, None, 3000], format="{:,d}"),
+        make_column('B,"x"', ["a", 'he said "hi"', None]),
+        make_column("C", ["x\ny", "", "p\tq"], dictionary=True),
+        make_column("D", [0, None, 59], pa.date32(), unit="month"),
+        make_column("E", [None, datetime.datetime(2022, 8, 1, 12, 30), None]),
+    )
+    assert _write_table_text(table) == (
+        b'A,"B,""x""",C,D,E\r\n'
+        b'1,a,"x\ny",1970-01,\r\n'
+        b',"he said ""hi""",,,2022-08-01T12:30Z\r\n'
+        b'"3,000",,p\tq,1970-03,\r\n'
+    )
+
+
+def test_write_table_text_tsv():
+    table = make_table(
+        make_column("A", [1, 3000], format="{:,d}"),
+        make_column("B", ["p\tq", "r,s"]),
+    )
+    assert _write_table_text(table, dialect="tsv") == (b'A\tB\n1\t"p\tq"\n3,000\tr,s\n')
+
+
+def test_write_table_text_batches(monkeypatch):
+    monkeypatch.setattr(cjwmodule.arrow.format, "_WRITE_BATCH_SIZE", 3)
+    table = make_table(
+        make_column("A", list(range(10)), format="{:d}"),
+        make_column("B", ["x%d" % i for i in range(10)]),
+    )
+    out = io.BytesIO()
+    writes = []
+    out_write = out.write
+    out.write = lambda b: writes.append(bytes(b)) or out_write(b)
+    write_table_text(table, out)
+    assert len(writes) == 5  # header, then 4 batches
+    assert out.getvalue() == b"A,B\r\n" + b"".join(
+        b"%d,x%d\r\n" % (i, i) for i in range(10)
+    )
+
+
+def test_write_table_text_no_rows():
+    table = make_table(make_column("A", [], pa.int32(), format="{:d}"))
+    assert _write_table_text(table) == b"A\r\n"
+
+
+def test_write_table_text_invalid_dialect():
+    with pytest.raises(ValueError, match="dialect must be"):
+        _write_table_text(make_table(), dialect="xlsx")